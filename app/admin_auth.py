@@ -1,11 +1,12 @@
 import os
 from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 from app.database import get_db
 from app.models import User
-from app.passwords import hash_password, verify_password
+from app.passwords import DUMMY_HASH, hash_password, verify_and_update_password
 from app.security import create_token
 from app.dependencies import require_admin
 
@@ -51,6 +52,8 @@ def ensure_admin_exists(db: Session):
 # =====================================================
 
 class AdminLoginPayload(BaseModel):
+    model_config = ConfigDict(str_max_length=256)
+
     email: EmailStr
     password: str
 
@@ -66,16 +69,22 @@ def admin_login(
     db: Session = Depends(get_db),
 ):
     admin = (
-        db.query(User)
+        db.query(User.id, User.email, User.hashed_password)
         .filter(User.email == payload.email, User.role == "admin", User.is_active == True)
         .first()
     )
 
-    if not admin or not verify_password(payload.password, admin.hashed_password):
+    ok, new_hash = verify_and_update_password(
+        payload.password, admin.hashed_password if admin else DUMMY_HASH
+    )
+    if not admin or not ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid admin credentials",
         )
+    if new_hash:
+        db.execute(update(User).where(User.id == admin.id).values(hashed_password=new_hash))
+        db.commit()
 
     token = create_token(user_id=str(admin.id), role="admin")
 
@@ -107,7 +116,7 @@ def admin_logout(response: Response):
 
 
 @router.get("/me")
-def admin_me(admin: User = Depends(require_admin)):
+async def admin_me(admin: User = Depends(require_admin)):
     return {
         "id": str(admin.id),
         "email": admin.email,
@@ -0,0 +1,116 @@
+# app/audit.py
+"""
+Audit log write queue + read cache.
+
+Writes: routes call queue_audit_log(db, ...) instead of db.add(AuditLog(...)).
+Rows are buffered on the session and written as one Core multi-row
+INSERT ... VALUES right before the session commits (no ORM objects, no
+unit-of-work bookkeeping); a rollback discards them, exactly as an
+uncommitted db.add() would have been.
+
+Reads: admins drilling into a product/order/user hit GET /api/admin/logs/{entity_id}
+repeatedly within a few seconds. Results are kept in a small module-level
+TTL cache (same approach as the homepage sections cache) and dropped whenever
+a new AuditLog row is written for that entity.
+"""
+
+import time
+import uuid
+
+from sqlalchemy import event, insert, null
+
+from app.database import SessionLocal
+from app.models import AuditLog
+
+_QUEUE_KEY = "audit_log_queue"
+
+ENTITY_LOGS_TTL     = 30    # seconds
+ENTITY_LOGS_MAX_KEYS = 512  # oldest entry is evicted past this
+
+# ✅ module-level cache — resets on every server restart
+# entity_id -> (stored_at, rows)
+_entity_logs_cache: dict = {}
+
+
+def get_cached_entity_logs(entity_id: str):
+    entry = _entity_logs_cache.get(entity_id)
+    if entry is None:
+        return None
+    stored_at, rows = entry
+    if time.time() - stored_at >= ENTITY_LOGS_TTL:
+        _entity_logs_cache.pop(entity_id, None)
+        return None
+    return rows
+
+
+def set_cached_entity_logs(entity_id: str, rows: list) -> None:
+    if len(_entity_logs_cache) >= ENTITY_LOGS_MAX_KEYS:
+        # dicts keep insertion order → first key is the oldest entry
+        _entity_logs_cache.pop(next(iter(_entity_logs_cache)), None)
+    _entity_logs_cache[entity_id] = (time.time(), rows)
+
+
+def invalidate_entity_logs(entity_id=None) -> None:
+    """Drop one entity's cached logs, or everything when entity_id is None."""
+    if entity_id is None:
+        _entity_logs_cache.clear()
+    else:
+        _entity_logs_cache.pop(str(entity_id), None)
+
+
+# ======================================================
+# WRITE QUEUE
+# ======================================================
+
+def queue_audit_log(db, admin_id, action, entity_type, entity_id,
+                    before=None, after=None, meta=None) -> None:
+    """Buffer one AuditLog row; it is inserted when `db` commits."""
+    queue_audit_logs(db, [{
+        "admin_id":    admin_id,
+        "action":      action,
+        "entity_type": entity_type,
+        "entity_id":   entity_id,
+        "before":      before,
+        "after":       after,
+        "meta":        meta,
+    }])
+
+
+def _json_or_null(value):
+    # Core VALUES would store None as JSON 'null'; keep SQL NULL like the ORM did.
+    return null() if value is None else value
+
+
+def queue_audit_logs(db, entries) -> None:
+    """Buffer several AuditLog rows (dicts with queue_audit_log's keyword names)."""
+    queue = db.info.setdefault(_QUEUE_KEY, [])
+    for entry in entries:
+        entity_id = entry.get("entity_id")
+        queue.append({
+            "id":          uuid.uuid4(),
+            "admin_id":    entry.get("admin_id"),
+            "action":      entry["action"],
+            "entity_type": entry["entity_type"],
+            "entity_id":   str(entity_id) if entity_id is not None else None,
+            "before":      _json_or_null(entry.get("before")),
+            "after":       _json_or_null(entry.get("after")),
+            "meta":        _json_or_null(entry.get("meta")),
+        })
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _flush_audit_queue(session):
+    rows = session.info.get(_QUEUE_KEY)
+    if rows:
+        session.execute(insert(AuditLog).values(rows))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_committed(session):
+    for row in session.info.pop(_QUEUE_KEY, None) or ():
+        invalidate_entity_logs(row["entity_id"])
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_audit_queue(session):
+    session.info.pop(_QUEUE_KEY, None)
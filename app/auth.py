@@ -1,12 +1,16 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from pydantic import BaseModel, EmailStr
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, ConfigDict, EmailStr
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User
-from app.passwords import hash_password, verify_password
-from app.security import create_token, get_current_user
+from app.passwords import DUMMY_HASH, hash_password, verify_and_update_password
+from app.dependencies import get_current_user
+from app.security import create_token
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 logger = logging.getLogger(__name__)
@@ -17,11 +21,16 @@ logger = logging.getLogger(__name__)
 # =========================
 
 class LoginPayload(BaseModel):
+    # Oversized bodies fail validation before any hashing work.
+    model_config = ConfigDict(str_max_length=256)
+
     email: EmailStr
     password: str
 
 
 class RegisterPayload(BaseModel):
+    model_config = ConfigDict(str_max_length=256)
+
     email: EmailStr
     password: str
     full_name: str | None = None
@@ -33,31 +42,36 @@ class RegisterPayload(BaseModel):
 # =========================
 
 @router.post("/register")
-def register(payload: RegisterPayload, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == payload.email).first()
-    if existing:
+async def register(payload: RegisterPayload, db: AsyncSession = Depends(get_async_db)):
+    # bcrypt/argon2 is CPU-bound — keep it off the event loop
+    hashed = await run_in_threadpool(hash_password, payload.password)
+
+    # One round-trip: the unique email index arbitrates duplicates, so there
+    # is no SELECT-then-INSERT race between concurrent sign-ups.
+    user_id = await db.scalar(
+        pg_insert(User)
+        .values(
+            email=payload.email,
+            hashed_password=hashed,
+            full_name=payload.full_name,
+            phone=payload.phone,
+            role="user",
+            is_active=True,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id)
+    )
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-
-    user = User(
-        email=payload.email,
-        hashed_password=hash_password(payload.password),
-        full_name=payload.full_name,
-        phone=payload.phone,
-        role="user",
-        is_active=True,
-    )
-
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
 
     return {
-        "id": str(user.id),
-        "email": user.email,
-        "role": user.role,
+        "id": str(user_id),
+        "email": payload.email,
+        "role": "user",
     }
 
 
@@ -66,14 +80,23 @@ def register(payload: RegisterPayload, db: Session = Depends(get_db)):
 # =========================
 
 @router.post("/login")
-def login(
+async def login(
     payload: LoginPayload,
     response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.email == payload.email).first()
-
-    if not user or not verify_password(payload.password, user.hashed_password):
+    # Plain row, not an ORM instance — login only reads these columns.
+    user = (await db.execute(
+        select(
+            User.id, User.email, User.hashed_password, User.full_name,
+            User.phone, User.role, User.is_active,
+        ).where(User.email == payload.email)
+    )).first()
+
+    ok, new_hash = await run_in_threadpool(
+        verify_and_update_password, payload.password, user.hashed_password if user else DUMMY_HASH
+    )
+    if not user or not ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -85,6 +108,11 @@ def login(
             detail="User disabled",
         )
 
+    if new_hash:
+        # Legacy bcrypt hash — upgrade to argon2 now that we have the plaintext
+        await db.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+        await db.commit()
+
     token = create_token(user_id=str(user.id), role=user.role)
 
     # Still set cookie for same-origin / Postman use
@@ -117,7 +145,7 @@ def login(
 # =========================
 
 @router.get("/me")
-def me(user: User = Depends(get_current_user)):
+async def me(user: User = Depends(get_current_user)):
     return {
         "id": str(user.id),
         "email": user.email,
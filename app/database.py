@@ -1,6 +1,8 @@
 import os
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 
 # ======================================================
 # DATABASE CONNECTION
@@ -17,18 +19,47 @@ if not DATABASE_URL:
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,       # drops stale connections (vital for Neon cold-starts)
-    pool_size=5,              # Neon free tier: max 10 connections, keep headroom
-    max_overflow=2,
-    pool_timeout=30,
-    pool_recycle=300,         # recycle connections every 5 min (avoids idle timeouts)
-    connect_args={
-        "sslmode": "require", # Neon mandates SSL; harmless on other Postgres hosts
-        "connect_timeout": 10,
-    },
-)
+# ── Pool sizing ────────────────────────────────────────────────────
+# One engine (and so one pool) per process; every SessionLocal() checks a
+# connection out of it and returns it on close — nothing is re-bound per
+# request. Defaults stay within Neon's free-tier connection limit; raise
+# them via env on bigger plans. Set DB_USE_PGBOUNCER=1 when DATABASE_URL
+# points at a pgbouncer / Neon "-pooler" endpoint: the bouncer then owns
+# pooling and a second client-side pool only pins server slots.
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").strip().lower() in ("1", "true", "yes")
+
+
+_CONNECT_ARGS = {
+    "sslmode": "require", # Neon mandates SSL; harmless on other Postgres hosts
+    "connect_timeout": 10,
+}
+
+_USE_PGBOUNCER = _env_flag("DB_USE_PGBOUNCER", False)
+
+if _USE_PGBOUNCER:
+    engine = create_engine(
+        DATABASE_URL,
+        poolclass=NullPool,
+        connect_args=_CONNECT_ARGS,
+    )
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        # drops stale connections (vital for Neon cold-starts); set
+        # DB_POOL_PRE_PING=0 on a stable network to skip the per-checkout ping
+        pool_pre_ping=_env_flag("DB_POOL_PRE_PING", True),
+        # Neon free tier: max 10 connections, split with the async pool below
+        pool_size=_env_int("DB_POOL_SIZE", 4),
+        max_overflow=_env_int("DB_MAX_OVERFLOW", 1),
+        pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+        pool_recycle=_env_int("DB_POOL_RECYCLE", 300), # recycle before Neon's idle timeout
+        connect_args=_CONNECT_ARGS,
+    )
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -36,6 +67,43 @@ SessionLocal = sessionmaker(
     autocommit=False,
 )
 
+# ── Async engine (auth, cart, pricing tool) ────────────────────────
+# Login / register, every /cart route and the admin pricing tool run as
+# async handlers so bursts of them don't tie up the threadpool. Cart traffic
+# is storefront-wide, so this pool gets an even share: sync 4+1 and async
+# 4+1 together stay at Neon's 10-connection cap. asyncpg takes ssl= instead of libpq's
+# sslmode / channel_binding URL params, so those are stripped here.
+_ASYNC_URL = (
+    make_url(DATABASE_URL)
+    .set(drivername="postgresql+asyncpg")
+    .difference_update_query(["sslmode", "channel_binding"])
+)
+_ASYNC_CONNECT_ARGS = {"ssl": "require", "timeout": 10}
+
+if _USE_PGBOUNCER:
+    # Transaction-mode pgbouncer can't keep per-connection prepared statements.
+    async_engine = create_async_engine(
+        _ASYNC_URL.update_query_dict({"prepared_statement_cache_size": "0"}),
+        poolclass=NullPool,
+        connect_args={**_ASYNC_CONNECT_ARGS, "statement_cache_size": 0},
+    )
+else:
+    async_engine = create_async_engine(
+        _ASYNC_URL,
+        pool_pre_ping=_env_flag("DB_POOL_PRE_PING", True),
+        pool_size=_env_int("DB_ASYNC_POOL_SIZE", 4),
+        max_overflow=_env_int("DB_ASYNC_MAX_OVERFLOW", 1),
+        pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+        pool_recycle=_env_int("DB_POOL_RECYCLE", 300),
+        connect_args=_ASYNC_CONNECT_ARGS,
+    )
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 
@@ -51,6 +119,11 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # ======================================================
 # 🔥 DATABASE BOOTSTRAP (SAFE + AUTO SYNC)
 # ======================================================
@@ -197,6 +270,11 @@ def init_database():
             "UUID REFERENCES stores(id) ON DELETE SET NULL")
         add_column_if_missing("products", "tags",
             "JSON")                                        # collection tags array
+        add_column_if_missing("products", "inventory_value",
+            "NUMERIC GENERATED ALWAYS AS ((stock * price)::numeric) STORED")  # inventory report SUM
+        add_column_if_missing("products", "pricing_sort_key",
+            "SMALLINT GENERATED ALWAYS AS (CASE pricing_status "
+            "WHEN 'admin_approved' THEN 2 WHEN 'ai_suggested' THEN 1 ELSE 0 END) STORED")  # pricing tool order
 
         # ==================================================
         # 🔥 AUTO-SYNC PRODUCT_IMAGES TABLE
@@ -225,6 +303,9 @@ def init_database():
         add_column_if_missing("orders", "is_deleted",       "BOOLEAN NOT NULL DEFAULT FALSE")
         add_column_if_missing("orders", "deleted_at",       "TIMESTAMPTZ")
 
+        add_column_if_missing("carts", "item_count", "INTEGER NOT NULL DEFAULT 0")
+        add_column_if_missing("carts", "subtotal",   "DOUBLE PRECISION NOT NULL DEFAULT 0")
+
         # ==================================================
         # 🔥 CREATE INDEXES (SAFE - ENTERPRISE ENHANCED)
         # ==================================================
@@ -284,6 +365,184 @@ def init_database():
     import app.models  # noqa: F401
     Base.metadata.create_all(bind=engine)
 
+    # ==================================================
+    # 🔥 PERFORMANCE INDEXES (partial / composite / BRIN)
+    # Runs after create_all so every target table exists.
+    # CREATE INDEX IF NOT EXISTS keeps re-runs zero-cost.
+    # ==================================================
+
+    PERF_INDEXES = [
+        # Append-only time series: revenue analytics range-scan created_at.
+        # BRIN is a few pages regardless of table size.
+        ("idx_orders_created_at_brin", """
+            ON orders USING BRIN (created_at)
+            WHERE is_deleted = FALSE
+              AND status IN ('paid', 'completed', 'shipped')
+        """),
+        # Top-products-by-revenue ranking (analytics_top_products).
+        ("idx_products_revenue_live", """
+            ON products ((sales * price) DESC NULLS LAST)
+            WHERE is_deleted = FALSE
+        """),
+        # Keyset pagination for the admin audit trail (get_audit_logs).
+        ("idx_audit_logs_created_id", """
+            ON audit_logs (created_at DESC, id DESC)
+        """),
+        # Per-entity history, newest first (get_entity_logs).
+        ("idx_audit_logs_entity_created", """
+            ON audit_logs (entity_id, created_at DESC)
+        """),
+        # User activity tab (get_user_activity) — covers the projected columns.
+        ("idx_audit_logs_type_entity_created", """
+            ON audit_logs (entity_type, entity_id, created_at DESC)
+            INCLUDE (id, action, admin_id)
+        """),
+        # Payment status timeline (get_payment_history).
+        ("idx_payment_history_payment_created", """
+            ON payment_status_history (payment_id, created_at DESC)
+        """),
+        # Admin session monitor (get_all_sessions): walk newest activity
+        # first, filtering expired rows from the INCLUDEd expires_at.
+        ("idx_user_sessions_activity", """
+            ON user_sessions (last_activity DESC, id DESC)
+            INCLUDE (expires_at)
+        """),
+        # Keyset pagination for the admin user list (list_users).
+        ("idx_users_created_id", """
+            ON users (created_at DESC, id DESC)
+        """),
+        # Admins are a handful of rows: list_users?role=admin walks this
+        # tiny partial index in the list's own sort order.
+        ("idx_users_admins", """
+            ON users (created_at DESC, id DESC)
+            WHERE role = 'admin'
+        """),
+        # Inventory screens. Predicates mirror the ORM filters exactly
+        # (is_deleted = FALSE) so the planner can match the partial index.
+        ("idx_products_low_stock", """
+            ON products (stock)
+            WHERE is_deleted = FALSE AND stock > 0 AND stock <= low_stock_threshold
+        """),
+        ("idx_products_out_of_stock", """
+            ON products (updated_at DESC)
+            WHERE is_deleted = FALSE AND stock = 0
+        """),
+        ("idx_products_dead_stock", """
+            ON products (created_at)
+            WHERE is_deleted = FALSE AND stock > 0 AND sales = 0
+        """),
+        # Narrow index for SUM(inventory_value) in inventory_report.
+        ("idx_products_inventory_value", """
+            ON products (inventory_value)
+            WHERE is_deleted = FALSE
+        """),
+        # Admin user search runs ILIKE '%term%' on email / full_name; a
+        # leading wildcard can't use a btree, trigram GIN indexes can.
+        ("idx_users_email_trgm", """
+            ON users USING gin (email gin_trgm_ops)
+        """),
+        ("idx_users_full_name_trgm", """
+            ON users USING gin (full_name gin_trgm_ops)
+        """),
+        # get_order_notes / order detail list notes newest-first per order.
+        ("idx_order_notes_order_created", """
+            ON order_notes (order_id, created_at DESC)
+        """),
+        # Every pricing write supersedes product_id's pending proposals.
+        ("idx_price_proposals_pending", """
+            ON price_proposals (product_id)
+            WHERE status = 'pending'
+        """),
+        # Pricing tool list order (unpriced → ai_suggested → approved, then
+        # title) read straight off the index — no per-row CASE, no sort.
+        ("idx_products_pricing_sort", """
+            ON products (pricing_sort_key, title)
+            WHERE is_deleted = FALSE
+        """),
+        # Storefront category sidebar (get_categories) groups only the
+        # live, in-stock catalogue — same predicate, so it scans this instead.
+        ("idx_products_live_category", """
+            ON products (category)
+            WHERE status = 'active' AND is_deleted = FALSE AND stock > 0
+        """),
+        # reset_bulk_priced_to_unpriced: bulk-priced rows no admin confirmed.
+        ("idx_products_active_priced_by_null", """
+            ON products (id)
+            WHERE is_deleted = FALSE AND is_priced = TRUE AND priced_by IS NULL
+        """),
+    ]
+
+    # Superseded: the pricing list now sorts on idx_products_pricing_sort, and
+    # nothing reads (pricing_status, title) — drop it so writes stop paying for it.
+    RETIRED_INDEXES = ["idx_products_active_pricing"]
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for idx_name, definition in PERF_INDEXES:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {idx_name} {definition}"))
+        for idx_name in RETIRED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {idx_name}"))
+
+    # ==================================================
+    # 🛒 CART SUMMARY (item_count / subtotal on carts)
+    # A row trigger on cart_items keeps both columns current for every
+    # writer — cart routes, wishlist moves, FK cascades — so the header
+    # badge (GET /cart/summary) reads one row instead of joining lines.
+    # ==================================================
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE OR REPLACE FUNCTION cart_items_refresh_summary() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                -- Lock the cart row *before* recounting: a writer that waited
+                -- on the lock then recounts in a fresh READ COMMITTED snapshot
+                -- that includes the line the first writer just committed.
+                IF TG_OP <> 'INSERT' THEN
+                    PERFORM 1 FROM carts WHERE id = OLD.cart_id FOR UPDATE;
+                    UPDATE carts SET
+                        item_count = (SELECT COUNT(*) FROM cart_items WHERE cart_id = OLD.cart_id),
+                        subtotal   = (SELECT COALESCE(SUM(price * quantity), 0)
+                                      FROM cart_items WHERE cart_id = OLD.cart_id)
+                    WHERE id = OLD.cart_id;
+                END IF;
+                IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.cart_id IS DISTINCT FROM OLD.cart_id) THEN
+                    PERFORM 1 FROM carts WHERE id = NEW.cart_id FOR UPDATE;
+                    UPDATE carts SET
+                        item_count = (SELECT COUNT(*) FROM cart_items WHERE cart_id = NEW.cart_id),
+                        subtotal   = (SELECT COALESCE(SUM(price * quantity), 0)
+                                      FROM cart_items WHERE cart_id = NEW.cart_id)
+                    WHERE id = NEW.cart_id;
+                END IF;
+                RETURN NULL;
+            END $$;
+        """))
+        # First boot with the trigger also backfills carts written before it
+        # existed; afterwards the trigger keeps them current.
+        conn.execute(text("""
+            DO $$ BEGIN
+                IF NOT EXISTS (
+                    SELECT 1 FROM pg_trigger WHERE tgname = 'trg_cart_items_summary'
+                ) THEN
+                    CREATE TRIGGER trg_cart_items_summary
+                    AFTER INSERT OR DELETE OR UPDATE OF cart_id, price, quantity ON cart_items
+                    FOR EACH ROW EXECUTE FUNCTION cart_items_refresh_summary();
+
+                    UPDATE carts c
+                    SET item_count = s.cnt, subtotal = s.total
+                    FROM (
+                        SELECT c2.id, COUNT(ci.id) AS cnt,
+                               COALESCE(SUM(ci.price * ci.quantity), 0) AS total
+                        FROM carts c2
+                        LEFT JOIN cart_items ci ON ci.cart_id = c2.id
+                        GROUP BY c2.id
+                    ) s
+                    WHERE c.id = s.id
+                      AND (c.item_count, c.subtotal) IS DISTINCT FROM (s.cnt, s.total);
+                END IF;
+            END $$;
+        """))
+
     # ==================================================
     # 🔥 SEED BEAUTY CATEGORIES (idempotent — safe to re-run)
     # These are the 20 category slugs that match products.category
@@ -1,9 +1,133 @@
-from fastapi import Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+import hashlib
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, status, Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from app.database import get_db
 from app.models import User
-from app.security import decode_access_token
+from app.redis_client import cache_delete, cache_delete_prefix, cache_get, cache_set, redis_client
+from app.security import TokenData, decode_token, get_token_from_request
+
+
+# =====================================================
+# AUTH CACHE
+# Every authenticated request used to decode the JWT and
+# SELECT the full user row. Both are cached in-process for
+# USER_CACHE_TTL seconds; user mutations invalidate eagerly.
+# hashed_password is never cached — it lazy-loads on access.
+#
+# With REDIS_URL set the user rows live in Redis instead, so
+# an invalidation on one worker is seen by all of them.
+# Decoded tokens stay per-process: they never change.
+# =====================================================
+
+USER_CACHE_TTL = 60
+
+_token_cache = TTLCache(maxsize=4096, ttl=USER_CACHE_TTL)   # sha256(token) -> (TokenData, exp)
+_user_cache  = TTLCache(maxsize=4096, ttl=USER_CACHE_TTL)   # user_id -> column dict
+_cache_lock  = threading.Lock()                             # cachetools is not thread-safe
+
+_USER_CACHED_COLUMNS = tuple(
+    c.key for c in User.__table__.columns if c.key != "hashed_password"
+)
+
+
+_REDIS_USER_PREFIX = "auth:user:"
+
+
+def _user_cache_get(user_id):
+    if redis_client is None:
+        with _cache_lock:
+            return _user_cache.get(str(user_id))
+    raw = cache_get(_REDIS_USER_PREFIX + str(user_id))
+    if raw is None:
+        return None
+    cached = json.loads(raw)
+    cached["id"] = uuid.UUID(cached["id"])
+    if cached.get("created_at"):
+        cached["created_at"] = datetime.fromisoformat(cached["created_at"])
+    return cached
+
+
+def _user_cache_set(user_id, cached: dict) -> None:
+    if redis_client is None:
+        with _cache_lock:
+            _user_cache[str(user_id)] = cached
+        return
+    cache_set(_REDIS_USER_PREFIX + str(user_id), json.dumps(cached, default=str), USER_CACHE_TTL)
+
+
+def invalidate_user_cache(user_id=None) -> None:
+    """Drop one user's cached row, or every user when user_id is None."""
+    with _cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(str(user_id), None)
+    if user_id is None:
+        cache_delete_prefix(_REDIS_USER_PREFIX)
+    else:
+        cache_delete(_REDIS_USER_PREFIX + str(user_id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_flush(mapper, connection, target):
+    invalidate_user_cache(target.id)
+
+
+def _decode_cached(request: Request):
+    token = get_token_from_request(request)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    # Keyed by digest so raw bearer tokens aren't kept around as dict keys.
+    key = hashlib.sha256(token.encode()).digest()
+    with _cache_lock:
+        entry = _token_cache.get(key)
+    if entry is not None and entry[1] > time.time():
+        return entry[0]
+
+    payload = decode_token(token)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    token_data = TokenData(user_id=payload["sub"], role=payload.get("role", "user"))
+    with _cache_lock:
+        # exp travels with the entry: a token never outlives its own expiry
+        _token_cache[key] = (token_data, payload["exp"])
+    return token_data
+
+
+def _attach_cached_user(db: Session, cached: dict) -> User:
+    # Rebuild a clean, session-attached instance without a SELECT so
+    # handlers can still mutate it or walk relationships.
+    user = User(**cached)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def _load_user(db: Session, user_id: str):
+    cached = _user_cache_get(user_id)
+    if cached is not None:
+        return _attach_cached_user(db, cached)
+
+    row = (
+        db.query(*(getattr(User, c) for c in _USER_CACHED_COLUMNS))
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+    cached = dict(row._mapping)
+    _user_cache_set(user_id, cached)
+    return _attach_cached_user(db, cached)
 
 
 # =====================================================
@@ -18,15 +142,11 @@ def get_current_user(
     Resolves the currently authenticated user from the access token cookie.
     """
 
-    token_data = decode_access_token(request)
+    token_data = _decode_cached(request)
 
-    user = (
-        db.query(User)
-        .filter(User.id == token_data.user_id, User.is_active == True)
-        .first()
-    )
+    user = _load_user(db, token_data.user_id)
 
-    if not user:
+    if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required",
@@ -55,3 +175,15 @@ def require_admin(
         )
 
     return user
+
+
+# =====================================================
+# RESPONSE CACHING
+# =====================================================
+
+def private_short_cache(response: Response) -> None:
+    """
+    Lets the admin's own browser reuse a list response for a few seconds
+    (rapid tab switching / re-clicks). `private` keeps shared caches out.
+    """
+    response.headers["Cache-Control"] = "private, max-age=5"
@@ -0,0 +1,29 @@
+# app/http_clients.py
+"""
+Shared outbound HTTP clients.
+
+One pooled httpx.AsyncClient per upstream, built at import and closed on
+shutdown (app.main). Reusing them keeps TCP/TLS connections alive between
+requests instead of paying a fresh handshake every call.
+"""
+
+import httpx
+
+# Exchange-rate APIs (exchangerate-api.com / open.er-api.com).
+fx_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(5.0, connect=2.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+)
+
+# Anthropic API, handed to AsyncAnthropic as its http_client. Timeouts are per
+# stage so a hung connect fails in 5s instead of eating the whole budget;
+# read is long because a web_search round trip can take tens of seconds.
+anthropic_http_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(60.0, connect=5.0, read=45.0, write=10.0, pool=5.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+)
+
+
+async def close_http_clients() -> None:
+    await fx_client.aclose()
+    await anthropic_http_client.aclose()
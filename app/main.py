@@ -1,7 +1,13 @@
+import os
+
+import anyio.to_thread
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from sqlalchemy import text
 
+from app import http_clients
 from app.database import init_database, SessionLocal
 from app.admin_auth import ensure_admin_exists
 
@@ -37,7 +43,9 @@ from app.routes import auto_pricing                             # ← AI Auto-Pr
 from app.routes import bulk_price_update                        # ← One-time bulk price update
 
 
-app = FastAPI(title="Karabo API", version="1.0.0")
+# orjson serialises the (often large) admin list payloads several times
+# faster than the stdlib json encoder.
+app = FastAPI(title="Karabo API", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -50,8 +58,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Estimate"],
 )
 
+# Large JSON list pages compress 10x+; tiny responses aren't worth the CPU.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # ── Health & Auth ──────────────────────────────────────────────────
 app.include_router(health.router)
 app.include_router(auth_router)
@@ -107,6 +119,22 @@ app.include_router(admin_users_advanced.router,     prefix="/api")
 #   GET /api/products/random/categories?per_category=6&max_cats=12
 
 
+# Sync routes and the bcrypt offloads in app.auth share anyio's default
+# thread limiter (40). Scale it with cores, never below the default.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", max(40, (os.cpu_count() or 1) * 4)))
+
+
+@app.on_event("startup")
+async def size_threadpool():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_clients.close_http_clients()
+    await auto_pricing.close_http_clients()
+
+
 @app.on_event("startup")
 def startup():
     init_database()
@@ -1,8 +1,8 @@
 import uuid
 import enum
 from sqlalchemy import (
-    Column, String, Text, Integer, Float, Boolean,
-    DateTime, JSON, Enum, ForeignKey, Index,
+    Column, String, Text, Integer, SmallInteger, Float, Boolean, Numeric,
+    DateTime, JSON, Enum, ForeignKey, Index, Computed,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -47,6 +47,20 @@ class ProductStatus(str, enum.Enum):
     archived = "archived"    # NEW
     draft = "draft"          # NEW
 
+# Pricing tool states — the columns stay VARCHAR; these name the values.
+class PricingStatus(str, enum.Enum):
+    unpriced = "unpriced"
+    ai_suggested = "ai_suggested"
+    admin_approved = "admin_approved"
+    admin_rejected = "admin_rejected"
+    deleted = "deleted"
+
+class ProposalStatus(str, enum.Enum):
+    pending = "pending"
+    approved = "approved"
+    rejected = "rejected"
+    superseded = "superseded"
+
 class BulkUploadStatus(str, enum.Enum):
     processing = "processing"
     completed = "completed"
@@ -137,6 +151,7 @@ class Product(Base):
     stock = Column(Integer, default=0)
     in_stock = Column(Boolean, default=False)
     low_stock_threshold = Column(Integer, default=10)   # NEW
+    inventory_value = Column(Numeric, Computed("(stock * price)::numeric", persisted=True))  # generated: stock × price
     store = Column(String, index=True)                  # kept for compat
     main_image = Column(String, nullable=True)           # primary image URL (denormalized for speed)
     image_url  = Column(String, nullable=True)           # fallback image URL
@@ -147,16 +162,20 @@ class Product(Base):
     is_priced      = Column(Boolean, default=False, nullable=False)   # pricing tool: has been priced/marked by admin
     priced_at      = Column(DateTime(timezone=True), nullable=True)   # pricing tool: when it was last priced
     pricing_status = Column(String, default="unpriced", nullable=False)  # unpriced | ai_suggested | admin_approved | admin_rejected
+    pricing_sort_key = Column(SmallInteger, Computed(
+        "CASE pricing_status WHEN 'admin_approved' THEN 2 WHEN 'ai_suggested' THEN 1 ELSE 0 END",
+        persisted=True,
+    ))  # generated: pricing tool list order
     priced_by      = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)  # admin who approved price
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    images = relationship("ProductImage", back_populates="product", cascade="all, delete-orphan", order_by="ProductImage.position")
-    variants = relationship("ProductVariant", back_populates="product", cascade="all, delete-orphan")  # NEW
+    images = relationship("ProductImage", back_populates="product", cascade="all, delete-orphan", passive_deletes=True, order_by="ProductImage.position")
+    variants = relationship("ProductVariant", back_populates="product", cascade="all, delete-orphan", passive_deletes=True)  # NEW
     store_ref = relationship("Store", back_populates="products", foreign_keys=[store_id])
 
     # Enterprise relationships
-    reviews = relationship("Review", back_populates="product", cascade="all, delete-orphan")
-    questions = relationship("ProductQuestion", back_populates="product", cascade="all, delete-orphan")
+    reviews = relationship("Review", back_populates="product", cascade="all, delete-orphan", passive_deletes=True)
+    questions = relationship("ProductQuestion", back_populates="product", cascade="all, delete-orphan", passive_deletes=True)
 
 Index("idx_products_status", Product.status)
 Index("idx_products_price", Product.price)
@@ -273,13 +292,13 @@ class Order(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     user = relationship("User", back_populates="orders")
-    payments = relationship("Payment", back_populates="order", cascade="all, delete-orphan")
+    payments = relationship("Payment", back_populates="order", cascade="all, delete-orphan", passive_deletes=True)
 
     # Enterprise relationships
-    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
-    returns = relationship("OrderReturn", back_populates="order", cascade="all, delete-orphan")
-    tracking = relationship("OrderTracking", back_populates="order", uselist=False, cascade="all, delete-orphan")
-    admin_notes = relationship("OrderNote", back_populates="order", cascade="all, delete-orphan")
+    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan", passive_deletes=True)
+    returns = relationship("OrderReturn", back_populates="order", cascade="all, delete-orphan", passive_deletes=True)
+    tracking = relationship("OrderTracking", back_populates="order", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    admin_notes = relationship("OrderNote", back_populates="order", cascade="all, delete-orphan", passive_deletes=True)
     is_deleted = Column(Boolean, default=False, nullable=False)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
 
@@ -399,6 +418,9 @@ class Cart(Base):
     __tablename__ = "carts"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True, unique=True)
+    # Kept in sync by the cart_items trigger (app.database) — never set from Python
+    item_count = Column(Integer, nullable=False, server_default="0")
+    subtotal = Column(Float, nullable=False, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     user = relationship("User", back_populates="cart")
@@ -777,4 +799,29 @@ class PriceProposal(Base):
 Index("idx_price_proposals_product_id",  PriceProposal.product_id)
 Index("idx_price_proposals_status",      PriceProposal.status)
 Index("idx_price_proposals_proposed_by", PriceProposal.proposed_by)
-Index("idx_price_proposals_created_at",  PriceProposal.created_at)
\ No newline at end of file
+Index("idx_price_proposals_created_at",  PriceProposal.created_at)
+
+class PriceProposalBatch(Base):
+    """
+    One Anthropic Message Batch submitted by the pricing tool.
+
+    Lifecycle:
+      submitted → (batch ends, results imported as pending PriceProposals) → ended
+
+    The exchange rate is locked at submit time so every proposal in the
+    batch is priced consistently, exactly like /propose-bulk.
+    """
+    __tablename__ = "price_proposal_batches"
+
+    id             = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    batch_id       = Column(String, nullable=False, unique=True)   # Anthropic msgbatch_… id
+    status         = Column(String, nullable=False, default="submitted")  # submitted | ended
+    submitted_by   = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    exchange_rate  = Column(Float, nullable=False)
+    rate_source    = Column(String, nullable=False)
+    item_count     = Column(Integer, nullable=False, default=0)
+    proposed_count = Column(Integer, nullable=False, default=0)
+    failed_count   = Column(Integer, nullable=False, default=0)
+    items          = Column(JSON, nullable=True)    # [{product_id, title, brand, category}]
+    ended_at       = Column(DateTime(timezone=True), nullable=True)
+    created_at     = Column(DateTime(timezone=True), server_default=func.now())
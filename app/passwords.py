@@ -1,10 +1,41 @@
+import hashlib
+import os
+import threading
+
+from cachetools import TTLCache
 from passlib.context import CryptContext
 from fastapi import HTTPException
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# New hashes use argon2id with a small memory footprint (~10ms per hash vs
+# ~100ms+ for bcrypt). bcrypt stays listed so existing $2b$ hashes still
+# verify; "deprecated=auto" flags them so login can rehash them.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=3,
+    argon2__memory_cost=4096,   # KiB
+    argon2__parallelism=1,
+)
+
+# Verified against when the email is unknown, so "no such user" costs the
+# same as "wrong password" — no timing oracle, no bimodal login latency.
+DUMMY_HASH = pwd_context.hash("karabo-login-timing-placeholder")
 
 BCRYPT_MAX_BYTES = 72
 
+# Login retry storms (same email + password, many times a second) verify
+# once; the rest wait on that result or read it from this short cache.
+# Keyed by the *stored* hash, so a password change is an instant miss, and
+# a per-process keyed BLAKE2b of the attempt — never the plaintext.
+# DUMMY_HASH verifies always bypass it (see verify_and_update_password).
+VERIFY_CACHE_TTL = 5  # seconds
+
+_verify_results  = TTLCache(maxsize=1000, ttl=VERIFY_CACHE_TTL)   # key -> (ok, new_hash)
+_verify_inflight = {}                                              # key -> threading.Lock
+_verify_lock     = threading.Lock()
+_attempt_key     = os.urandom(32)
+
 
 def _validate_password_length(password: str):
     if len(password.encode("utf-8")) > BCRYPT_MAX_BYTES:
@@ -22,3 +53,36 @@ def hash_password(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     _validate_password_length(plain)
     return pwd_context.verify(plain, hashed)
+
+
+def verify_and_update_password(plain: str, hashed: str):
+    """
+    Returns (ok, new_hash). new_hash is set when `hashed` uses a legacy
+    scheme or outdated parameters — callers should store it.
+    Concurrent identical attempts share one verify (single-flight).
+    """
+    _validate_password_length(plain)
+    if hashed == DUMMY_HASH:
+        # Unknown email: every one shares this hash, so a cached result would
+        # make a seen guess against a made-up email return instantly while a
+        # real account still pays the full verify — an enumeration oracle.
+        return pwd_context.verify_and_update(plain, hashed)
+
+    attempt = hashlib.blake2b(plain.encode("utf-8"), digest_size=16, key=_attempt_key).digest()
+    key = (hashed, attempt)
+
+    with _verify_lock:
+        result = _verify_results.get(key)
+        if result is not None:
+            return result
+        key_lock = _verify_inflight.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _verify_lock:
+            result = _verify_results.get(key)
+        if result is None:
+            result = pwd_context.verify_and_update(plain, hashed)
+            with _verify_lock:
+                _verify_results[key] = result
+                _verify_inflight.pop(key, None)
+    return result
@@ -0,0 +1,189 @@
+# app/redis_client.py
+"""
+Optional shared Redis cache.
+
+Set REDIS_URL (and install `redis`) to share short-lived caches across
+uvicorn workers / instances. Without it every helper here is a no-op and
+callers fall back to their in-process caches.
+
+Redis is a cache, never a source of truth: connection errors are logged
+and treated as a miss so a Redis outage can't take auth or pricing down.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+try:
+    import redis
+    import redis.asyncio as redis_async
+    _redis_ok = True
+except ImportError:
+    _redis_ok = False
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+
+def _connect():
+    if not (_redis_ok and REDIS_URL):
+        return None
+    return redis.Redis.from_url(
+        REDIS_URL,
+        socket_timeout=0.5,           # a slow cache is worse than a miss
+        socket_connect_timeout=0.5,
+        health_check_interval=30,
+    )
+
+
+redis_client = _connect()
+
+
+def _connect_async():
+    if not (_redis_ok and REDIS_URL):
+        return None
+    return redis_async.Redis.from_url(
+        REDIS_URL,
+        socket_timeout=0.5,
+        socket_connect_timeout=0.5,
+        health_check_interval=30,
+    )
+
+
+# Same server, asyncio client — for callers already on the event loop.
+async_redis_client = _connect_async()
+
+
+def cache_get(key: str):
+    if redis_client is None:
+        return None
+    try:
+        return redis_client.get(key)
+    except redis.RedisError as e:
+        logger.warning("Redis GET %s failed: %s", key, e)
+        return None
+
+
+def cache_set(key: str, value, ttl: int) -> None:
+    if redis_client is None:
+        return
+    try:
+        redis_client.set(key, value, ex=ttl)
+    except redis.RedisError as e:
+        logger.warning("Redis SET %s failed: %s", key, e)
+
+
+def cache_delete(*keys: str) -> None:
+    if redis_client is None or not keys:
+        return
+    try:
+        redis_client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning("Redis DEL failed: %s", e)
+
+
+def cache_delete_prefix(prefix: str) -> None:
+    if redis_client is None:
+        return
+    try:
+        keys = list(redis_client.scan_iter(match=f"{prefix}*", count=500))
+        if keys:
+            redis_client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning("Redis prefix delete %s failed: %s", prefix, e)
+
+
+# ======================================================
+# ASYNC HELPERS
+# ======================================================
+
+async def async_cache_get(key: str):
+    if async_redis_client is None:
+        return None
+    try:
+        return await async_redis_client.get(key)
+    except redis.RedisError as e:
+        logger.warning("Redis GET %s failed: %s", key, e)
+        return None
+
+
+async def async_cache_set(key: str, value, ttl: int) -> None:
+    if async_redis_client is None:
+        return
+    try:
+        await async_redis_client.set(key, value, ex=ttl)
+    except redis.RedisError as e:
+        logger.warning("Redis SET %s failed: %s", key, e)
+
+
+async def async_cache_incr(key: str, ttl: int):
+    """INCR `key` (expiring after ttl); None when Redis is off or failing."""
+    if async_redis_client is None:
+        return None
+    try:
+        async with async_redis_client.pipeline(transaction=True) as pipe:
+            count, _ = await pipe.incr(key).expire(key, ttl).execute()
+        return count
+    except redis.RedisError as e:
+        logger.warning("Redis INCR %s failed: %s", key, e)
+        return None
+
+
+# Counting semaphore on a sorted set: members are holders, scores their
+# acquire time. Leases older than `lease` seconds are dropped first, so a
+# worker that dies mid-call can't leak a slot forever.
+_SEMAPHORE_ACQUIRE = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', tonumber(ARGV[2]) - tonumber(ARGV[3]))
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[4])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+@asynccontextmanager
+async def distributed_semaphore(name: str, limit: int, lease: int = 120, max_wait: float = 60.0):
+    """
+    Hold one of `limit` slots shared by every worker using this Redis.
+
+    Without Redis (or if it errors) this is a no-op — callers keep their
+    in-process semaphore as the floor. Waiters back off exponentially up to
+    1s; after `max_wait` seconds the slot is taken anyway (logged) rather
+    than failing the request.
+    """
+    if async_redis_client is None:
+        yield
+        return
+
+    key    = f"sem:{name}"
+    member = uuid.uuid4().hex
+    held   = False
+    delay  = 0.05
+    deadline = time.monotonic() + max_wait
+    try:
+        while True:
+            if await async_redis_client.eval(_SEMAPHORE_ACQUIRE, 1, key, limit, time.time(), lease, member):
+                held = True
+                break
+            if time.monotonic() >= deadline:
+                logger.warning("Semaphore %s: no slot after %.0fs, proceeding", name, max_wait)
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+    except redis.RedisError as e:
+        logger.warning("Redis semaphore %s unavailable: %s", name, e)
+
+    try:
+        yield
+    finally:
+        if held:
+            try:
+                await async_redis_client.zrem(key, member)
+            except redis.RedisError as e:
+                logger.warning("Redis semaphore %s release failed: %s", name, e)
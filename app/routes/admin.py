@@ -4,19 +4,28 @@ Central admin API: dashboard, analytics, inventory, store-reset, orders, users,
 Every route is protected by require_admin.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
+from sqlalchemy import Integer, delete, func, select, text, true, tuple_, update
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Literal, Optional
+from uuid import UUID
+from pydantic import BaseModel
+import base64
 import calendar
+import json
+import re
 
 from app.database import get_db
 from app.models import (
     User, Product, ProductImage, Order, OrderStatus, Payment, PaymentStatus,
     AuditLog, BulkUpload, Store,
 )
-from app.dependencies import require_admin
+from app.dependencies import invalidate_user_cache, private_short_cache, require_admin
+from app.routes.admin_users import update_user_row
+from app.audit import (
+    get_cached_entity_logs, set_cached_entity_logs, invalidate_entity_logs, queue_audit_log,
+)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -30,39 +39,65 @@ def _month_start():
     return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
 
-def _get_stats(db: Session) -> dict:
-    """Reusable stats block used by dashboard and overview analytics."""
-    total_products   = db.query(Product).filter(Product.is_deleted == False).count()
-    active_products  = db.query(Product).filter(Product.status == "active", Product.is_deleted == False).count()
-    total_orders     = db.query(Order).filter(Order.is_deleted == False).count()
-    paid_orders      = db.query(Order).filter(Order.status == "paid", Order.is_deleted == False).count()
-    pending_payments = db.query(Payment).filter(Payment.status == "pending").count()
-    low_stock_products = db.query(Product).filter(
-        Product.stock > 0,
-        Product.stock <= Product.low_stock_threshold,
-        Product.is_deleted == False,
-    ).count()
-
-    total_revenue = db.query(func.sum(Order.total_amount)).filter(
-        Order.status.in_(["paid", "completed", "shipped"]),
-        Order.is_deleted == False,
-    ).scalar() or 0.0
-
-    revenue_this_month = db.query(func.sum(Order.total_amount)).filter(
-        Order.status.in_(["paid", "completed", "shipped"]),
-        Order.is_deleted == False,
-        Order.created_at >= _month_start(),
-    ).scalar() or 0.0
+def _estimate_count(db: Session, query) -> int:
+    """
+    Planner row estimate for an ORM query via EXPLAIN — no rows are read.
+    Good enough for "~120k results" style totals in the admin UI.
+    """
+    compiled = query.statement.compile(
+        dialect=db.bind.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    plan = db.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
 
+def _get_stats(db: Session) -> dict:
+    """
+    Reusable stats block used by dashboard and overview analytics.
+    One round-trip: a FILTER-aggregate subquery per table, joined ON TRUE
+    (each yields exactly one row; explicit so the FROM linter sees no
+    accidental cartesian product).
+    """
+    live_product = Product.is_deleted == False
+    live_order   = Order.is_deleted == False
+    earning      = Order.status.in_(["paid", "completed", "shipped"])
+
+    products = select(
+        func.count().filter(live_product).label("total_products"),
+        func.count().filter(live_product, Product.status == "active").label("active_products"),
+        func.count().filter(
+            live_product, Product.stock > 0, Product.stock <= Product.low_stock_threshold,
+        ).label("low_stock_products"),
+    ).subquery()
+    orders = select(
+        func.count().filter(live_order).label("total_orders"),
+        func.count().filter(live_order, Order.status == "paid").label("paid_orders"),
+        func.sum(Order.total_amount).filter(live_order, earning).label("total_revenue"),
+        func.sum(Order.total_amount).filter(
+            live_order, earning, Order.created_at >= _month_start(),
+        ).label("revenue_this_month"),
+    ).subquery()
+    payments = select(
+        func.count().filter(Payment.status == "pending").label("pending_payments"),
+    ).subquery()
+
+    row = db.execute(
+        select(products, orders, payments)
+        .select_from(products)
+        .join(orders, true())
+        .join(payments, true())
+    ).one()
     return {
-        "total_products":     total_products,
-        "active_products":    active_products,
-        "total_orders":       total_orders,
-        "paid_orders":        paid_orders,
-        "pending_payments":   pending_payments,
-        "low_stock_products": low_stock_products,
-        "total_revenue":      round(total_revenue, 2),
-        "revenue_this_month": round(revenue_this_month, 2),
+        "total_products":     row.total_products,
+        "active_products":    row.active_products,
+        "total_orders":       row.total_orders,
+        "paid_orders":        row.paid_orders,
+        "pending_payments":   row.pending_payments,
+        "low_stock_products": row.low_stock_products,
+        "total_revenue":      round(row.total_revenue or 0.0, 2),
+        "revenue_this_month": round(row.revenue_this_month or 0.0, 2),
     }
 
 
@@ -85,120 +120,142 @@ def analytics_overview(db: Session = Depends(get_db)):
     return _get_stats(db)
 
 
+# Compiled once at import — `since` is a bind parameter so every call reuses the
+# same statement. date_trunc() keeps the created_at range predicate sargable for
+# the BRIN index created in init_database (idx_orders_created_at_brin).
+_REVENUE_BY_DAY_SQL = text("""
+    SELECT date_trunc('day', created_at)::date AS date,
+           SUM(total_amount)                   AS revenue,
+           COUNT(*)                            AS orders
+    FROM orders
+    WHERE status IN ('paid', 'completed', 'shipped')
+      AND is_deleted = FALSE
+      AND created_at >= :since
+    GROUP BY 1
+    ORDER BY 1
+""")
+
+
 @router.get("/analytics/revenue", dependencies=[Depends(require_admin)])
 def analytics_revenue(days: int = Query(30, ge=7, le=365), db: Session = Depends(get_db)):
     """Revenue per day for the last `days` days."""
     since = datetime.now(timezone.utc) - timedelta(days=days)
-    rows = (
-        db.query(
-            func.date(Order.created_at).label("date"),
-            func.sum(Order.total_amount).label("revenue"),
-            func.count(Order.id).label("orders"),
-        )
-        .filter(
-            Order.status.in_(["paid", "completed", "shipped"]),
-            Order.is_deleted == False,
-            Order.created_at >= since,
-        )
-        .group_by(func.date(Order.created_at))
-        .order_by(func.date(Order.created_at))
-        .all()
-    )
+    rows = db.execute(_REVENUE_BY_DAY_SQL, {"since": since}).all()
     return [
         {"date": str(r.date), "revenue": round(float(r.revenue or 0), 2), "orders": r.orders}
         for r in rows
     ]
 
 
+def _primary_image_url():
+    """Correlated subquery: primary image, else first by position, else main_image."""
+    first_image = (
+        select(ProductImage.image_url)
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.is_primary.desc(), ProductImage.position.asc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return func.coalesce(first_image, Product.main_image).label("main_image")
+
+
 @router.get("/analytics/top-products", dependencies=[Depends(require_admin)])
 def analytics_top_products(limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
-    """Top products by sales count."""
-    products = (
-        db.query(Product)
+    """Top products by revenue (sales × price), ranked in SQL."""
+    revenue = (Product.sales * Product.price).label("revenue")
+    rows = (
+        db.query(
+            Product.id, Product.title, Product.sales, Product.stock, Product.price, revenue,
+            _primary_image_url(),
+        )
         .filter(Product.is_deleted == False)
-        .order_by(Product.sales.desc())
+        .order_by(revenue.desc().nullslast())
         .limit(limit)
         .all()
     )
     return [
         {
-            "product_id": str(p.id),
-            "title":      p.title,
-            "sales":      p.sales or 0,
-            "revenue":    round((p.sales or 0) * p.price, 2),
-            "stock":      p.stock,
-            "price":      p.price,
-            "main_image": next((img.image_url for img in p.images if img.is_primary), None)
-                          or (p.images[0].image_url if p.images else None),
+            "product_id": str(r.id),
+            "title":      r.title,
+            "sales":      r.sales or 0,
+            "revenue":    round(r.revenue or 0, 2),
+            "stock":      r.stock,
+            "price":      r.price,
+            "main_image": r.main_image,
         }
-        for p in products
+        for r in rows
     ]
 
 
+def _days_listed():
+    """Whole days since the product was created, computed server-side."""
+    return func.coalesce(
+        func.extract("day", func.now() - Product.created_at), 0
+    ).cast(Integer).label("days_listed")
+
+
 @router.get("/analytics/dead-stock", dependencies=[Depends(require_admin)])
 def analytics_dead_stock(limit: int = Query(50, ge=1, le=200), db: Session = Depends(get_db)):
     """Products with stock > 0 but 0 sales."""
-    products = (
-        db.query(Product)
+    rows = (
+        db.query(Product.id, Product.title, Product.stock, Product.price, _days_listed())
         .filter(Product.is_deleted == False, Product.stock > 0, Product.sales == 0)
         .order_by(Product.created_at.asc())
         .limit(limit)
         .all()
     )
-    now = datetime.now(timezone.utc)
     return [
         {
-            "product_id":  str(p.id),
-            "title":       p.title,
-            "stock":       p.stock,
-            "price":       p.price,
-            "days_listed": (now - p.created_at.replace(tzinfo=timezone.utc) if p.created_at else timedelta(0)).days,
+            "product_id":  str(r.id),
+            "title":       r.title,
+            "stock":       r.stock,
+            "price":       r.price,
+            "days_listed": r.days_listed,
         }
-        for p in products
+        for r in rows
     ]
 
 
 @router.get("/analytics/stock-turnover", dependencies=[Depends(require_admin)])
 def analytics_stock_turnover(limit: int = Query(50, ge=1, le=200), db: Session = Depends(get_db)):
     """Stock turnover rate = sales / (stock + sales) * 10."""
-    products = (
-        db.query(Product)
+    rows = (
+        db.query(Product.id, Product.title, Product.sales, Product.stock, _days_listed())
         .filter(Product.is_deleted == False, Product.sales > 0)
         .order_by(Product.sales.desc())
         .limit(limit)
         .all()
     )
-    now = datetime.now(timezone.utc)
     return [
         {
-            "product_id":    str(p.id),
-            "title":         p.title,
-            "sales":         p.sales or 0,
-            "stock":         p.stock,
-            "turnover_rate": round((p.sales or 0) / max(p.stock + (p.sales or 0), 1) * 10, 2),
-            "days_in_stock": (now - p.created_at.replace(tzinfo=timezone.utc) if p.created_at else timedelta(0)).days,
+            "product_id":    str(r.id),
+            "title":         r.title,
+            "sales":         r.sales or 0,
+            "stock":         r.stock,
+            "turnover_rate": round((r.sales or 0) / max(r.stock + (r.sales or 0), 1) * 10, 2),
+            "days_in_stock": r.days_listed,
         }
-        for p in products
+        for r in rows
     ]
 
 
 @router.get("/orders/analytics", dependencies=[Depends(require_admin)])
 def orders_analytics(db: Session = Depends(get_db)):
-    """Order breakdown by status."""
-    total_orders = db.query(Order).filter(Order.is_deleted == False).count()
-    total_revenue = db.query(func.sum(Order.total_amount)).filter(
-        Order.status.in_(["paid", "completed", "shipped"]), Order.is_deleted == False
-    ).scalar() or 0
-
+    """Order breakdown by status — one GROUP BY, totals derived from it."""
     by_status_rows = (
         db.query(Order.status, func.count(Order.id), func.sum(Order.total_amount))
         .filter(Order.is_deleted == False)
         .group_by(Order.status)
         .all()
     )
+    total_orders = sum(count for _, count, _ in by_status_rows)
+    total_revenue = 0.0
     by_status = {}
     for status, count, revenue in by_status_rows:
-        by_status[status.value if hasattr(status, "value") else str(status)] = {
+        key = status.value if hasattr(status, "value") else str(status)
+        if key in ("paid", "completed", "shipped"):
+            total_revenue += float(revenue or 0)
+        by_status[key] = {
             "count":      count,
             "revenue":    round(float(revenue or 0), 2),
             "percentage": round(count / max(total_orders, 1) * 100, 1),
@@ -216,15 +273,18 @@ def orders_analytics(db: Session = Depends(get_db)):
 
 @router.get("/orders/revenue", dependencies=[Depends(require_admin)])
 def orders_revenue(db: Session = Depends(get_db)):
-    return analytics_revenue(db=db)
+    return analytics_revenue(days=30, db=db)
 
 
 @router.get("/orders/conversion", dependencies=[Depends(require_admin)])
 def orders_conversion(db: Session = Depends(get_db)):
-    total    = db.query(Order).filter(Order.is_deleted == False).count()
-    paid     = db.query(Order).filter(Order.status.in_(["paid", "completed"]), Order.is_deleted == False).count()
-    pending  = db.query(Order).filter(Order.status == "pending", Order.is_deleted == False).count()
-    cancelled = db.query(Order).filter(Order.status == "cancelled", Order.is_deleted == False).count()
+    row = db.query(
+        func.count(Order.id),
+        func.count(Order.id).filter(Order.status.in_(["paid", "completed"])),
+        func.count(Order.id).filter(Order.status == "pending"),
+        func.count(Order.id).filter(Order.status == "cancelled"),
+    ).filter(Order.is_deleted == False).one()
+    total, paid, pending, cancelled = row
     return {
         "total": total,
         "paid": paid,
@@ -240,8 +300,11 @@ def orders_conversion(db: Session = Depends(get_db)):
 
 @router.get("/inventory/low-stock", dependencies=[Depends(require_admin)])
 def low_stock(limit: int = 50, db: Session = Depends(get_db)):
-    products = (
-        db.query(Product)
+    rows = (
+        db.query(
+            Product.id, Product.title, Product.stock, Product.low_stock_threshold,
+            Product.price, Product.category, _primary_image_url(),
+        )
         .filter(
             Product.is_deleted == False,
             Product.stock > 0,
@@ -253,23 +316,25 @@ def low_stock(limit: int = 50, db: Session = Depends(get_db)):
     )
     return [
         {
-            "id":         str(p.id),
-            "title":      p.title,
-            "stock":      p.stock,
-            "threshold":  p.low_stock_threshold,
-            "price":      p.price,
-            "category":   p.category,
-            "main_image": next((img.image_url for img in p.images if img.is_primary), None)
-                          or (p.images[0].image_url if p.images else None),
+            "id":         str(r.id),
+            "title":      r.title,
+            "stock":      r.stock,
+            "threshold":  r.low_stock_threshold,
+            "price":      r.price,
+            "category":   r.category,
+            "main_image": r.main_image,
         }
-        for p in products
+        for r in rows
     ]
 
 
 @router.get("/inventory/out-of-stock", dependencies=[Depends(require_admin)])
 def out_of_stock(limit: int = 100, db: Session = Depends(get_db)):
-    products = (
-        db.query(Product)
+    rows = (
+        db.query(
+            Product.id, Product.title, Product.stock, Product.price,
+            Product.category, Product.status, _primary_image_url(),
+        )
         .filter(Product.is_deleted == False, Product.stock == 0)
         .order_by(Product.updated_at.desc())
         .limit(limit)
@@ -277,28 +342,28 @@ def out_of_stock(limit: int = 100, db: Session = Depends(get_db)):
     )
     return [
         {
-            "id":       str(p.id),
-            "title":    p.title,
-            "stock":    p.stock,
-            "price":    p.price,
-            "category": p.category,
-            "status":   p.status,
-            "main_image": next((img.image_url for img in p.images if img.is_primary), None)
-                          or (p.images[0].image_url if p.images else None),
+            "id":       str(r.id),
+            "title":    r.title,
+            "stock":    r.stock,
+            "price":    r.price,
+            "category": r.category,
+            "status":   r.status,
+            "main_image": r.main_image,
         }
-        for p in products
+        for r in rows
     ]
 
 
 @router.get("/inventory/report", dependencies=[Depends(require_admin)])
 def inventory_report(db: Session = Depends(get_db)):
-    total       = db.query(Product).filter(Product.is_deleted == False).count()
-    in_stock    = db.query(Product).filter(Product.is_deleted == False, Product.stock > 0).count()
-    out         = db.query(Product).filter(Product.is_deleted == False, Product.stock == 0).count()
-    low         = db.query(Product).filter(
-        Product.is_deleted == False, Product.stock > 0, Product.stock <= Product.low_stock_threshold
-    ).count()
-    total_value = db.query(func.sum(Product.stock * Product.price)).filter(Product.is_deleted == False).scalar() or 0
+    live = Product.is_deleted == False
+    total, in_stock, out, low, total_value = db.query(
+        func.count(),
+        func.count().filter(Product.stock > 0),
+        func.count().filter(Product.stock == 0),
+        func.count().filter(Product.stock > 0, Product.stock <= Product.low_stock_threshold),
+        func.coalesce(func.sum(Product.inventory_value), 0),
+    ).select_from(Product).filter(live).one()
     return {
         "total_products":   total,
         "in_stock":         in_stock,
@@ -308,42 +373,79 @@ def inventory_report(db: Session = Depends(get_db)):
     }
 
 
-@router.post("/inventory/adjust", dependencies=[Depends(require_admin)])
-def adjust_inventory(payload: dict, db: Session = Depends(get_db), admin=Depends(require_admin)):
+# Single atomic statement: lock the row, apply the delta (clamped at 0) and hand
+# back both the old and new stock. No SELECT-then-write race between admins.
+_ADJUST_STOCK_SQL = text("""
+    WITH prev AS (
+        SELECT id, stock FROM products
+        WHERE id = :id AND is_deleted = FALSE
+        FOR UPDATE
+    )
+    UPDATE products p
+    SET stock    = GREATEST(0, prev.stock + :change),
+        in_stock = (prev.stock + :change) > 0
+    FROM prev
+    WHERE p.id = prev.id
+    RETURNING p.id, prev.stock AS before, p.stock AS after
+""")
+
+
+def _apply_stock_change(payload: dict, db: Session, admin, adjustment_type: str):
     from app.models import InventoryAdjustment
-    product_id = payload.get("product_id")
-    quantity   = int(payload.get("quantity", 0))
-    product    = db.query(Product).filter(Product.id == product_id, Product.is_deleted == False).first()
-    if not product:
+    quantity = int(payload.get("quantity", 0))
+    row = db.execute(
+        _ADJUST_STOCK_SQL, {"id": payload.get("product_id"), "change": quantity}
+    ).one_or_none()
+    if not row:
         raise HTTPException(404, "Product not found")
-    before        = product.stock
-    product.stock = max(0, product.stock + quantity)
-    product.in_stock = product.stock > 0
     db.add(InventoryAdjustment(
-        product_id=product.id,
-        adjustment_type="manual",
-        quantity_before=before,
+        product_id=row.id,
+        adjustment_type=adjustment_type,
+        quantity_before=row.before,
         quantity_change=quantity,
-        quantity_after=product.stock,
+        quantity_after=row.after,
         note=payload.get("note"),
         admin_id=admin.id,
     ))
     db.commit()
-    return {"message": "Inventory adjusted", "stock": product.stock}
+    return {"message": "Inventory adjusted", "stock": row.after}
+
+
+@router.post("/inventory/adjust", dependencies=[Depends(require_admin)])
+def adjust_inventory(payload: dict, db: Session = Depends(get_db), admin=Depends(require_admin)):
+    return _apply_stock_change(payload, db, admin, "manual")
 
 
 @router.post("/inventory/incoming", dependencies=[Depends(require_admin)])
 def incoming_inventory(payload: dict, db: Session = Depends(get_db), admin=Depends(require_admin)):
-    return adjust_inventory(payload, db=db, admin=admin)
+    return _apply_stock_change(payload, db, admin, "incoming")
 
 
 # ─────────────────────────────────────────────────────────────
 # STORES
 # ─────────────────────────────────────────────────────────────
 
+_SLUG_RE = re.compile(r"[^a-z0-9-]+")
+
+
 @router.get("/stores", dependencies=[Depends(require_admin)])
 def list_stores(db: Session = Depends(get_db)):
-    stores = db.query(Store).order_by(Store.created_at.desc()).all()
+    product_counts = (
+        db.query(Product.store_id, func.count(Product.id).label("product_count"))
+        .filter(Product.is_deleted == False, Product.store_id.isnot(None))
+        .group_by(Product.store_id)
+        .subquery()
+    )
+    rows = (
+        db.query(
+            Store.id, Store.name, Store.slug, Store.description, Store.logo_url,
+            Store.is_active, Store.created_at,
+            func.coalesce(product_counts.c.product_count, 0).label("product_count"),
+        )
+        .outerjoin(product_counts, product_counts.c.store_id == Store.id)
+        .order_by(Store.created_at.desc())
+        .all()
+    )
     return [
         {
             "id":          str(s.id),
@@ -353,19 +455,18 @@ def list_stores(db: Session = Depends(get_db)):
             "logo_url":    s.logo_url,
             "is_active":   s.is_active,
             "created_at":  s.created_at,
-            "product_count": db.query(Product).filter(Product.store_id == s.id, Product.is_deleted == False).count(),
+            "product_count": s.product_count,
         }
-        for s in stores
+        for s in rows
     ]
 
 
 @router.post("/stores", dependencies=[Depends(require_admin)], status_code=201)
 def create_store(payload: dict, db: Session = Depends(get_db)):
-    import re
     name = payload.get("name", "").strip()
     if not name:
         raise HTTPException(400, "name is required")
-    slug = payload.get("slug") or re.sub(r"[^a-z0-9-]", "-", name.lower()).strip("-")
+    slug = payload.get("slug") or _SLUG_RE.sub("-", name.lower()).strip("-")
     if db.query(Store).filter(Store.slug == slug).first():
         raise HTTPException(400, f"Slug '{slug}' already exists")
     store = Store(
@@ -441,15 +542,45 @@ def admin_update_shipping(order_id: str, payload: dict, db: Session = Depends(ge
 # USERS
 # ─────────────────────────────────────────────────────────────
 
-@router.get("/users", dependencies=[Depends(require_admin)])
+def _encode_cursor(created_at: datetime, row_id) -> str:
+    raw = json.dumps({"ts": created_at.isoformat(), "id": str(row_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(data["ts"]), UUID(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+@router.get("/users", dependencies=[Depends(require_admin), Depends(private_short_cache)])
 def list_users(
     search: Optional[str] = None,
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
+    cursor: Optional[str] = None,
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
+    include_total: bool = False,
     db: Session = Depends(get_db),
 ):
+    """
+    Newest-first user list with keyset pagination.
+    Pass the returned next_cursor to get the following page. `page` is still
+    honoured when no cursor is sent (legacy clients) but costs an OFFSET scan.
+    `total` is opt-in (include_total=true): a pg_class estimate when unfiltered,
+    an exact COUNT otherwise.
+    """
+    # Correlated per-row subquery — Postgres evaluates it only for the rows that
+    # survive ORDER BY/LIMIT, each via idx on orders.user_id.
+    order_count = (
+        select(func.count(Order.id))
+        .where(Order.user_id == User.id, Order.is_deleted == False)
+        .scalar_subquery()
+        .label("order_count")
+    )
     query = db.query(User)
     if search:
         q = f"%{search}%"
@@ -459,10 +590,28 @@ def list_users(
         query = query.filter(User.role == role)
     if is_active is not None:
         query = query.filter(User.is_active == is_active)
-    total = query.count()
-    users = query.order_by(User.created_at.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    result = {}
+    if include_total:
+        filtered = bool(search or role or is_active is not None)
+        estimate = None if filtered else _estimate_rows(db, "users").get("users")
+        result["total"] = estimate if estimate is not None else query.count()
+        result["total_estimated"] = estimate is not None
+    query = query.with_entities(
+        User.id, User.email, User.full_name, User.phone, User.role, User.is_active,
+        User.avatar_url, User.created_at, order_count,
+    ).order_by(User.created_at.desc(), User.id.desc())
+    if cursor:
+        cur_ts, cur_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(User.created_at, User.id) < tuple_(cur_ts, cur_id))
+    elif page > 1:
+        query = query.offset((page - 1) * per_page)
+    users = query.limit(per_page + 1).all()
+    has_more = len(users) > per_page
+    users = users[:per_page]
     return {
-        "total": total,
+        **result,
+        "has_more": has_more,
+        "next_cursor": _encode_cursor(users[-1].created_at, users[-1].id) if has_more else None,
         "results": [
             {
                 "id":         str(u.id),
@@ -473,7 +622,7 @@ def list_users(
                 "is_active":  u.is_active,
                 "avatar_url": u.avatar_url,
                 "created_at": u.created_at,
-                "order_count": db.query(Order).filter(Order.user_id == u.id, Order.is_deleted == False).count(),
+                "order_count": u.order_count,
             }
             for u in users
         ],
@@ -482,35 +631,24 @@ def list_users(
 
 @router.post("/users/{user_id}/disable", dependencies=[Depends(require_admin)])
 def disable_user(user_id: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(404, "User not found")
-    user.is_active = False
-    db.commit()
-    return {"id": str(user.id), "status": "disabled"}
+    row = update_user_row(db, user_id, is_active=False)
+    return {"id": str(row.id), "status": "disabled"}
 
 
 @router.post("/users/{user_id}/enable", dependencies=[Depends(require_admin)])
 def enable_user(user_id: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(404, "User not found")
-    user.is_active = True
-    db.commit()
-    return {"id": str(user.id), "status": "enabled"}
+    row = update_user_row(db, user_id, is_active=True)
+    return {"id": str(row.id), "status": "enabled"}
+
+
+class RoleChangePayload(BaseModel):
+    role: Literal["user", "admin"]
 
 
 @router.post("/users/{user_id}/role", dependencies=[Depends(require_admin)])
-def change_role(user_id: str, payload: dict, db: Session = Depends(get_db)):
-    role = payload.get("role") if isinstance(payload, dict) else None
-    if role not in {"user", "admin"}:
-        raise HTTPException(400, "Role must be 'user' or 'admin'")
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(404, "User not found")
-    user.role = role
-    db.commit()
-    return {"id": str(user.id), "role": user.role}
+def change_role(user_id: str, payload: RoleChangePayload, db: Session = Depends(get_db)):
+    row = update_user_row(db, user_id, role=payload.role)
+    return {"id": str(row.id), "role": row.role}
 
 
 @router.delete("/users/{user_id}", dependencies=[Depends(require_admin)])
@@ -531,16 +669,41 @@ def delete_user(user_id: str, db: Session = Depends(get_db), admin=Depends(requi
 # AUDIT LOGS
 # ─────────────────────────────────────────────────────────────
 
-@router.get("/logs", dependencies=[Depends(require_admin)])
+@router.get("/logs", dependencies=[Depends(require_admin), Depends(private_short_cache)])
 def get_audit_logs(
+    response: Response,
     limit: int = Query(100, ge=1, le=500),
     entity_type: Optional[str] = None,
+    before_created_at: Optional[datetime] = None,
+    before_id: Optional[UUID] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db),
 ):
-    query = db.query(AuditLog)
+    """
+    Newest-first audit trail with keyset pagination.
+    Pass the created_at + id of the last row received to fetch the next page;
+    each page is an index range scan on (created_at, id) regardless of depth.
+    include_total=true adds an approximate X-Total-Estimate header (planner
+    estimate, no COUNT scan).
+    """
+    query = (
+        db.query(AuditLog, User.email)
+        .outerjoin(User, User.id == AuditLog.admin_id)
+    )
     if entity_type:
         query = query.filter(AuditLog.entity_type == entity_type)
-    logs = query.order_by(AuditLog.created_at.desc()).limit(limit).all()
+    if before_created_at and before_id:
+        query = query.filter(
+            tuple_(AuditLog.created_at, AuditLog.id) < tuple_(before_created_at, before_id)
+        )
+    elif before_created_at:
+        query = query.filter(AuditLog.created_at < before_created_at)
+    if include_total:
+        estimate_query = db.query(AuditLog.id)
+        if entity_type:
+            estimate_query = estimate_query.filter(AuditLog.entity_type == entity_type)
+        response.headers["X-Total-Estimate"] = str(_estimate_count(db, estimate_query))
+    rows = query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit).all()
     return [
         {
             "id":          str(l.id),
@@ -551,16 +714,25 @@ def get_audit_logs(
             "after":       l.after,
             "meta":        l.meta,
             "created_at":  l.created_at,
-            "admin_email": l.admin.email if l.admin else None,
+            "admin_email": admin_email,
         }
-        for l in logs
+        for l, admin_email in rows
     ]
 
 
 @router.get("/logs/{entity_id}", dependencies=[Depends(require_admin)])
 def get_entity_logs(entity_id: str, db: Session = Depends(get_db)):
-    logs = db.query(AuditLog).filter(AuditLog.entity_id == entity_id).order_by(AuditLog.created_at.desc()).all()
-    return [
+    cached = get_cached_entity_logs(entity_id)
+    if cached is not None:
+        return cached
+    rows = (
+        db.query(AuditLog, User.email)
+        .outerjoin(User, User.id == AuditLog.admin_id)
+        .filter(AuditLog.entity_id == entity_id)
+        .order_by(AuditLog.created_at.desc())
+        .all()
+    )
+    result = [
         {
             "id":          str(l.id),
             "action":      l.action,
@@ -568,10 +740,12 @@ def get_entity_logs(entity_id: str, db: Session = Depends(get_db)):
             "before":      l.before,
             "after":       l.after,
             "created_at":  l.created_at,
-            "admin_email": l.admin.email if l.admin else None,
+            "admin_email": admin_email,
         }
-        for l in logs
+        for l, admin_email in rows
     ]
+    set_cached_entity_logs(entity_id, result)
+    return result
 
 
 # ─────────────────────────────────────────────────────────────
@@ -579,12 +753,32 @@ def get_entity_logs(entity_id: str, db: Session = Depends(get_db)):
 # ─────────────────────────────────────────────────────────────
 
 @router.post("/verify-password", dependencies=[Depends(require_admin)])
-def verify_password_check(payload: dict, db: Session = Depends(get_db), admin=Depends(require_admin)):
+def verify_password_check(
+    payload: dict,
+    x_admin_verification: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    """
+    Re-check the admin password before a destructive action.
+    Returns a 5-minute verification_token; sending it back (X-Admin-Verification
+    header or payload) re-verifies with an HMAC check instead of bcrypt.
+    """
     from app.passwords import verify_password
+    from app.security import (
+        VERIFICATION_TOKEN_EXPIRE_SECONDS, check_verification_token, create_verification_token,
+    )
+    token = x_admin_verification or payload.get("verification_token")
+    if check_verification_token(token, admin.id):
+        return {"verified": True, "verification_token": token}
     password = payload.get("password", "")
     if not verify_password(password, admin.hashed_password):
         raise HTTPException(401, "Incorrect password")
-    return {"verified": True}
+    return {
+        "verified": True,
+        "verification_token": create_verification_token(admin.id),
+        "expires_in": VERIFICATION_TOKEN_EXPIRE_SECONDS,
+    }
 
 
 # ─────────────────────────────────────────────────────────────
@@ -592,27 +786,62 @@ def verify_password_check(payload: dict, db: Session = Depends(get_db), admin=De
 # All operations are DESTRUCTIVE — require careful use
 # ─────────────────────────────────────────────────────────────
 
+def _count_rows(db: Session, **targets) -> dict:
+    """
+    COUNT(*) several tables in one round-trip.
+    targets: name -> (Model, *where clauses)
+    """
+    subqueries = [
+        select(func.count()).select_from(model).where(*where).scalar_subquery().label(name)
+        for name, (model, *where) in targets.items()
+    ]
+    row = db.query(*subqueries).one()
+    return dict(row._mapping)
+
+
+def _estimate_rows(db: Session, *tables: str) -> dict:
+    """
+    Planner row estimates from pg_class — instant, accurate to the last
+    (auto)ANALYZE. Tables never analyzed (reltuples = -1) are left out.
+    """
+    rows = db.execute(
+        text("""
+            SELECT relname, reltuples::bigint AS cnt
+            FROM pg_class
+            WHERE relkind = 'r' AND relname = ANY(:names) AND pg_table_is_visible(oid)
+        """),
+        {"names": list(tables)},
+    ).all()
+    return {r.relname: r.cnt for r in rows if r.cnt >= 0}
+
+
 @router.get("/store-reset/preview", dependencies=[Depends(require_admin)])
-def store_reset_preview(db: Session = Depends(get_db)):
-    """Show what each reset operation would affect."""
-    return {
-        "products":        db.query(Product).filter(Product.is_deleted == False).count(),
-        "deleted_products": db.query(Product).filter(Product.is_deleted == True).count(),
-        "orders":          db.query(Order).filter(Order.is_deleted == False).count(),
-        "cancelled_orders": db.query(Order).filter(Order.status == "cancelled", Order.is_deleted == False).count(),
-        "users":           db.query(User).filter(User.role != "admin").count(),
-        "payments":        db.query(Payment).count(),
-        "audit_logs":      db.query(AuditLog).count(),
+def store_reset_preview(exact: bool = False, db: Session = Depends(get_db)):
+    """
+    Show what each reset operation would affect.
+    Whole-table figures (payments, audit_logs) are pg_class estimates unless
+    exact=true; filtered figures are always exact, in one round-trip.
+    """
+    targets = {
+        "products":         (Product, Product.is_deleted == False),
+        "deleted_products": (Product, Product.is_deleted == True),
+        "orders":           (Order, Order.is_deleted == False),
+        "cancelled_orders": (Order, Order.status == "cancelled", Order.is_deleted == False),
+        "users":            (User, User.role != "admin"),
+        "payments":         (Payment,),
+        "audit_logs":       (AuditLog,),
     }
+    estimates = {} if exact else _estimate_rows(db, "payments", "audit_logs")
+    counts = _count_rows(db, **{k: v for k, v in targets.items() if k not in estimates})
+    return {**{k: counts.get(k, estimates.get(k)) for k in targets}, "estimated": sorted(estimates)}
 
 
 @router.post("/store-reset/products-only", dependencies=[Depends(require_admin)])
 def reset_products_only(db: Session = Depends(get_db), admin=Depends(require_admin)):
     """Hard-delete ALL products (including images). Cannot be undone."""
-    count = db.query(Product).count()
-    db.query(Product).delete(synchronize_session=False)
-    db.add(AuditLog(admin_id=admin.id, action="store_reset_products", entity_type="store", entity_id="all",
-                    meta={"deleted": count}))
+    count = db.execute(delete(Product)).rowcount
+    queue_audit_log(db, admin_id=admin.id, action="store_reset_products", entity_type="store", entity_id="all",
+                    meta={"deleted": count})
     db.commit()
     return {"message": f"Permanently deleted {count} products", "deleted": count}
 
@@ -620,12 +849,10 @@ def reset_products_only(db: Session = Depends(get_db), admin=Depends(require_adm
 @router.post("/store-reset/orders-only", dependencies=[Depends(require_admin)])
 def reset_orders_only(db: Session = Depends(get_db), admin=Depends(require_admin)):
     """Hard-delete ALL orders and payments. Cannot be undone."""
-    order_count   = db.query(Order).count()
-    payment_count = db.query(Payment).count()
-    db.query(Payment).delete(synchronize_session=False)
-    db.query(Order).delete(synchronize_session=False)
-    db.add(AuditLog(admin_id=admin.id, action="store_reset_orders", entity_type="store", entity_id="all",
-                    meta={"orders": order_count, "payments": payment_count}))
+    payment_count = db.execute(delete(Payment)).rowcount
+    order_count   = db.execute(delete(Order)).rowcount
+    queue_audit_log(db, admin_id=admin.id, action="store_reset_orders", entity_type="store", entity_id="all",
+                    meta={"orders": order_count, "payments": payment_count})
     db.commit()
     return {"message": f"Deleted {order_count} orders and {payment_count} payments"}
 
@@ -633,88 +860,113 @@ def reset_orders_only(db: Session = Depends(get_db), admin=Depends(require_admin
 @router.post("/store-reset/users-data", dependencies=[Depends(require_admin)])
 def reset_users_data(db: Session = Depends(get_db), admin=Depends(require_admin)):
     """Delete all non-admin users."""
-    count = db.query(User).filter(User.role != "admin").count()
-    db.query(User).filter(User.role != "admin").delete(synchronize_session=False)
-    db.add(AuditLog(admin_id=admin.id, action="store_reset_users", entity_type="store", entity_id="all",
-                    meta={"deleted": count}))
+    count = db.execute(delete(User).where(User.role != "admin")).rowcount
+    queue_audit_log(db, admin_id=admin.id, action="store_reset_users", entity_type="store", entity_id="all",
+                    meta={"deleted": count})
     db.commit()
+    invalidate_user_cache()
     return {"message": f"Deleted {count} non-admin users"}
 
 
 @router.post("/store-reset/audit-logs", dependencies=[Depends(require_admin)])
 def reset_audit_logs(db: Session = Depends(get_db), admin=Depends(require_admin)):
     """Clear all audit logs."""
+    # Nothing references audit_logs, so TRUNCATE is safe here and avoids
+    # per-row WAL. Tables with SET NULL children (products, orders) keep
+    # using DELETE — TRUNCATE ... CASCADE would wipe those children too.
     count = db.query(AuditLog).count()
-    db.query(AuditLog).delete(synchronize_session=False)
+    db.execute(text("TRUNCATE TABLE audit_logs"))
+    invalidate_entity_logs()
     db.commit()
     return {"message": f"Deleted {count} audit log entries"}
 
 
+# Parent tables only, in FK-safe order. Child rows (items, tracking, notes,
+# images, variants, reviews, carts, …) go via ON DELETE CASCADE; payments are
+# listed explicitly only so the response can report how many were removed.
+_FULL_RESET_STEPS = (
+    ("payments", delete(Payment)),
+    ("orders",   delete(Order)),
+    ("products", delete(Product)),
+    ("users",    delete(User).where(User.role != "admin")),
+)
+
+
 @router.post("/store-reset/full", dependencies=[Depends(require_admin)])
 def store_reset_full(db: Session = Depends(get_db), admin=Depends(require_admin)):
     """Full store reset: products, orders, payments, non-admin users. CANNOT BE UNDONE."""
-    product_count = db.query(Product).count()
-    order_count   = db.query(Order).count()
-    payment_count = db.query(Payment).count()
-    user_count    = db.query(User).filter(User.role != "admin").count()
-
-    db.query(Payment).delete(synchronize_session=False)
-    db.query(Order).delete(synchronize_session=False)
-    db.query(Product).delete(synchronize_session=False)
-    db.query(User).filter(User.role != "admin").delete(synchronize_session=False)
-
-    db.add(AuditLog(admin_id=admin.id, action="store_reset_full", entity_type="store", entity_id="all",
-                    meta={"products": product_count, "orders": order_count,
-                          "payments": payment_count, "users": user_count}))
+    # One transaction; rowcount replaces separate COUNT(*)s.
+    deleted = {name: db.execute(stmt).rowcount for name, stmt in _FULL_RESET_STEPS}
+    queue_audit_log(db, admin_id=admin.id, action="store_reset_full", entity_type="store", entity_id="all",
+                    meta=deleted)
     db.commit()
-    return {
-        "message": "Full store reset completed",
-        "deleted": {
-            "products": product_count,
-            "orders":   order_count,
-            "payments": payment_count,
-            "users":    user_count,
-        },
-    }
+    invalidate_user_cache()
+    return {"message": "Full store reset completed", "deleted": deleted}
 
 
 @router.post("/store-reset/restore-stock", dependencies=[Depends(require_admin)])
 def restore_stock(threshold: int = Query(100), db: Session = Depends(get_db), admin=Depends(require_admin)):
     """Set all out-of-stock products back to threshold units."""
-    count = db.query(Product).filter(Product.is_deleted == False, Product.stock == 0).update(
-        {"stock": threshold, "in_stock": True}, synchronize_session=False
-    )
+    count = db.execute(
+        update(Product)
+        .where(Product.is_deleted == False, Product.stock == 0)
+        .values(stock=threshold, in_stock=threshold > 0)
+        .execution_options(synchronize_session=False)
+    ).rowcount
     db.commit()
     return {"message": f"Restocked {count} products to {threshold} units", "updated": count}
 
 
+def _set_live_products_status(status: str):
+    return (
+        update(Product)
+        .where(Product.is_deleted == False, Product.status != status)
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+
+
 @router.post("/store-reset/deactivate-all-products", dependencies=[Depends(require_admin)])
 def deactivate_all_products(db: Session = Depends(get_db), admin=Depends(require_admin)):
-    count = db.query(Product).filter(Product.is_deleted == False).update(
-        {"status": "inactive"}, synchronize_session=False
-    )
+    count = db.execute(_set_live_products_status("inactive")).rowcount
     db.commit()
     return {"message": f"Deactivated {count} products", "updated": count}
 
 
 @router.post("/store-reset/activate-all-products", dependencies=[Depends(require_admin)])
 def activate_all_products(db: Session = Depends(get_db), admin=Depends(require_admin)):
-    count = db.query(Product).filter(Product.is_deleted == False).update(
-        {"status": "active"}, synchronize_session=False
-    )
+    count = db.execute(_set_live_products_status("active")).rowcount
     db.commit()
     return {"message": f"Activated {count} products", "updated": count}
 
 
+PURGE_BATCH_SIZE = 5000
+
+# Next batch of cancelled order ids, resolved inside the DELETE itself —
+# ids never travel to Python and each batch is its own short transaction.
+_PURGE_CANCELLED_BATCH = delete(Order).where(
+    Order.id.in_(
+        select(Order.id)
+        .where(Order.status == OrderStatus.cancelled)
+        .limit(PURGE_BATCH_SIZE)
+        .scalar_subquery()
+    )
+).execution_options(synchronize_session=False)
+
+
 @router.delete("/store-reset/cancelled-orders", dependencies=[Depends(require_admin)])
 def purge_cancelled_orders(db: Session = Depends(get_db), admin=Depends(require_admin)):
-    """Permanently delete all cancelled orders."""
-    orders = db.query(Order).filter(Order.status == OrderStatus.cancelled).all()
-    count = len(orders)
-    for o in orders:
-        db.delete(o)
-    db.add(AuditLog(admin_id=admin.id, action="purge_cancelled_orders", entity_type="order", entity_id="all",
-                    meta={"count": count}))
+    """Permanently delete all cancelled orders, PURGE_BATCH_SIZE per transaction."""
+    # Child rows (items, payments, notes, tracking) go via ON DELETE CASCADE.
+    count = 0
+    while True:
+        deleted = db.execute(_PURGE_CANCELLED_BATCH).rowcount
+        db.commit()
+        count += deleted
+        if deleted < PURGE_BATCH_SIZE:
+            break
+    queue_audit_log(db, admin_id=admin.id, action="purge_cancelled_orders", entity_type="order", entity_id="all",
+                    meta={"count": count})
     db.commit()
     return {"message": f"Purged {count} cancelled orders", "deleted": count}
 
@@ -724,10 +976,10 @@ def reset_sales(payload: dict = None, db: Session = Depends(get_db), admin=Depen
     """Reset sales count. Pass ids[] to reset specific products, or empty for all."""
     payload = payload or {}
     ids = payload.get("ids")
-    query = db.query(Product).filter(Product.is_deleted == False)
+    stmt = update(Product).where(Product.is_deleted == False)
     if ids:
-        query = query.filter(Product.id.in_(ids))
-    count = query.update({"sales": 0}, synchronize_session=False)
+        stmt = stmt.where(Product.id.in_(ids))
+    count = db.execute(stmt.values(sales=0).execution_options(synchronize_session=False)).rowcount
     db.commit()
     return {"message": f"Reset sales for {count} products", "updated": count}
 
@@ -737,10 +989,12 @@ def reset_ratings(payload: dict = None, db: Session = Depends(get_db), admin=Dep
     """Reset ratings. Pass ids[] to reset specific products, or empty for all."""
     payload = payload or {}
     ids = payload.get("ids")
-    query = db.query(Product).filter(Product.is_deleted == False)
+    stmt = update(Product).where(Product.is_deleted == False)
     if ids:
-        query = query.filter(Product.id.in_(ids))
-    count = query.update({"rating": 0, "rating_number": 0}, synchronize_session=False)
+        stmt = stmt.where(Product.id.in_(ids))
+    count = db.execute(
+        stmt.values(rating=0, rating_number=0).execution_options(synchronize_session=False)
+    ).rowcount
     db.commit()
     return {"message": f"Reset ratings for {count} products", "updated": count}
 
@@ -750,9 +1004,8 @@ def hard_delete_all_products(payload: dict, db: Session = Depends(get_db), admin
     """Permanently hard-delete ALL products including soft-deleted ones."""
     if not payload.get("confirm"):
         raise HTTPException(400, "Send confirm: true to proceed")
-    count = db.query(Product).count()
-    db.query(Product).delete(synchronize_session=False)
-    db.add(AuditLog(admin_id=admin.id, action="hard_delete_all_products", entity_type="product", entity_id="all",
-                    meta={"count": count}))
+    count = db.execute(delete(Product)).rowcount
+    queue_audit_log(db, admin_id=admin.id, action="hard_delete_all_products", entity_type="product", entity_id="all",
+                    meta={"count": count})
     db.commit()
     return {"message": f"Permanently deleted {count} products", "deleted": count}
\ No newline at end of file
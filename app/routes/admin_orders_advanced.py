@@ -9,7 +9,7 @@ from app.dependencies import require_admin
 router = APIRouter(prefix="/admin/orders", tags=["admin-orders-advanced"])
 
 class StatusOverridePayload(BaseModel):
-    status: str
+    status: OrderStatus
     reason: str
 
 class RefundPayload(BaseModel):
@@ -24,6 +24,10 @@ class OrderNotePayload(BaseModel):
     note: str
     is_internal: bool = True
 
+def _add_internal_note(db: Session, order_id, admin: User, text: str):
+    # One INSERT per event instead of rewriting the ever-growing orders.notes TEXT.
+    db.add(OrderNote(order_id=order_id, admin_id=admin.id, note=text, is_internal=True))
+
 @router.delete("/{order_id}", status_code=status.HTTP_200_OK)
 def hard_delete_order(order_id: str, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
     order = db.query(Order).filter(Order.id == order_id).first()
@@ -38,14 +42,8 @@ def force_status_override(order_id: str, payload: StatusOverridePayload, db: Ses
     order = db.query(Order).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(404, "Order not found")
-    try:
-        order.status = OrderStatus(payload.status)
-    except ValueError:
-        raise HTTPException(400, "Invalid status")
-    if order.notes:
-        order.notes += f"\n[Admin override by {admin.email}: {payload.reason}]"
-    else:
-        order.notes = f"[Admin override by {admin.email}: {payload.reason}]"
+    order.status = payload.status
+    _add_internal_note(db, order.id, admin, f"[Admin override by {admin.email}: {payload.reason}]")
     db.commit()
     return {"message": "Status overridden", "new_status": order.status}
 
@@ -54,10 +52,7 @@ def process_refund(order_id: str, payload: RefundPayload, db: Session = Depends(
     order = db.query(Order).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(404, "Order not found")
-    if order.notes:
-        order.notes += f"\n[Full refund processed: {payload.amount} by {admin.email}. Reason: {payload.reason}]"
-    else:
-        order.notes = f"[Full refund processed: {payload.amount} by {admin.email}. Reason: {payload.reason}]"
+    _add_internal_note(db, order.id, admin, f"[Full refund processed: {payload.amount} by {admin.email}. Reason: {payload.reason}]")
     order.status = OrderStatus.cancelled
     db.commit()
     return {"message": "Refund processed", "amount": payload.amount}
@@ -69,10 +64,7 @@ def process_partial_refund(order_id: str, payload: PartialRefundPayload, db: Ses
         raise HTTPException(404, "Order not found")
     if payload.amount > order.total_amount:
         raise HTTPException(400, "Refund amount exceeds order total")
-    if order.notes:
-        order.notes += f"\n[Partial refund: {payload.amount} by {admin.email}. Reason: {payload.reason}]"
-    else:
-        order.notes = f"[Partial refund: {payload.amount} by {admin.email}. Reason: {payload.reason}]"
+    _add_internal_note(db, order.id, admin, f"[Partial refund: {payload.amount} by {admin.email}. Reason: {payload.reason}]")
     db.commit()
     return {"message": "Partial refund processed", "amount": payload.amount}
 
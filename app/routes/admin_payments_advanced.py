@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from datetime import datetime
+from typing import List
+from uuid import UUID
 from app.database import get_db
 from app.models import User, Payment, PaymentStatus, PaymentStatusHistory
 from app.dependencies import require_admin
@@ -9,9 +11,17 @@ from app.dependencies import require_admin
 router = APIRouter(prefix="/payments/admin", tags=["admin-payments-advanced"])
 
 class StatusOverridePayload(BaseModel):
-    status: str
+    status: PaymentStatus
     reason: str
 
+class BulkStatusItem(BaseModel):
+    payment_id: UUID
+    status: PaymentStatus
+    reason: str
+
+class BulkStatusPayload(BaseModel):
+    items: List[BulkStatusItem]
+
 @router.delete("/{payment_id}", status_code=status.HTTP_200_OK)
 def hard_delete_payment(payment_id: str, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
     payment = db.query(Payment).filter(Payment.id == payment_id).first()
@@ -27,22 +37,70 @@ def force_payment_status_override(payment_id: str, payload: StatusOverridePayloa
     if not payment:
         raise HTTPException(404, "Payment not found")
     old_status = payment.status
-    try:
-        payment.status = PaymentStatus(payload.status)
-    except ValueError:
-        raise HTTPException(400, "Invalid status")
+    payment.status = payload.status
     payment.reviewed_by = admin.id
-    payment.reviewed_at = datetime.utcnow()
+    payment.reviewed_at = func.now()
     if payment.admin_notes:
         payment.admin_notes += f"\n[Force override by {admin.email}: {payload.reason}]"
     else:
         payment.admin_notes = f"[Force override by {admin.email}: {payload.reason}]"
-    history = PaymentStatusHistory(payment_id=payment_id, old_status=old_status, new_status=payload.status, changed_by=admin.id, reason=payload.reason)
+    history = PaymentStatusHistory(payment_id=payment_id, old_status=old_status, new_status=payload.status.value, changed_by=admin.id, reason=payload.reason)
     db.add(history)
     db.commit()
     return {"message": "Payment status overridden", "new_status": payment.status}
 
+@router.post("/bulk-status", status_code=status.HTTP_200_OK)
+def bulk_payment_status_override(payload: BulkStatusPayload, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
+    """Apply many status overrides in one transaction."""
+    items = {item.payment_id: item for item in payload.items}   # last entry wins per payment
+    if not items:
+        raise HTTPException(400, "items required")
+    old = dict(db.execute(
+        select(Payment.id, Payment.status).where(Payment.id.in_(items)).with_for_update()
+    ).all())
+    missing = [str(pid) for pid in items if pid not in old]
+    if missing:
+        raise HTTPException(404, f"Payments not found: {', '.join(missing)}")
+
+    # One UPDATE per distinct (status, reason) instead of one per payment.
+    groups = {}
+    for pid, item in items.items():
+        groups.setdefault((item.status, item.reason), []).append(pid)
+    for (new_status, reason), ids in groups.items():
+        note = f"[Force override by {admin.email}: {reason}]"
+        db.execute(
+            update(Payment)
+            .where(Payment.id.in_(ids))
+            .values(
+                status=new_status,
+                reviewed_by=admin.id,
+                reviewed_at=func.now(),
+                admin_notes=func.coalesce(Payment.admin_notes + "\n", "") + note,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.execute(insert(PaymentStatusHistory).values([
+        {
+            "payment_id": pid,
+            "old_status": old[pid].value,
+            "new_status": item.status.value,
+            "changed_by": admin.id,
+            "reason":     item.reason,
+        }
+        for pid, item in items.items()
+    ]))
+    db.commit()
+    return {"message": "Payment statuses overridden", "updated": len(items)}
+
 @router.get("/{payment_id}/history", status_code=status.HTTP_200_OK)
 def get_payment_history(payment_id: str, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
-    history = db.query(PaymentStatusHistory).filter(PaymentStatusHistory.payment_id == payment_id).order_by(PaymentStatusHistory.created_at.desc()).all()
+    history = (
+        db.query(
+            PaymentStatusHistory.id, PaymentStatusHistory.old_status, PaymentStatusHistory.new_status,
+            PaymentStatusHistory.changed_by, PaymentStatusHistory.reason, PaymentStatusHistory.created_at,
+        )
+        .filter(PaymentStatusHistory.payment_id == payment_id)
+        .order_by(PaymentStatusHistory.created_at.desc())
+        .all()
+    )
     return [{"id": str(h.id), "old_status": h.old_status, "new_status": h.new_status, "changed_by": str(h.changed_by) if h.changed_by else None, "reason": h.reason, "created_at": h.created_at} for h in history]
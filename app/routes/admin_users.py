@@ -1,9 +1,12 @@
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import User
-from app.dependencies import require_admin
+from app.dependencies import invalidate_user_cache, private_short_cache, require_admin
 
 router = APIRouter(prefix="/admin/users", tags=["admin-users"])
 
@@ -11,9 +14,18 @@ router = APIRouter(prefix="/admin/users", tags=["admin-users"])
 # =====================================================
 # ADMIN: LIST USERS
 # =====================================================
-@router.get("", dependencies=[Depends(require_admin)])
+@router.get("", dependencies=[Depends(require_admin), Depends(private_short_cache)])
 def list_users(db: Session = Depends(get_db)):
-    users = db.query(User).order_by(User.created_at.desc()).all()
+    # Plain row tuples, streamed in batches — no mapped instances for what can
+    # be the whole users table.
+    users = (
+        db.query(
+            User.id, User.email, User.full_name, User.phone,
+            User.role, User.is_active, User.created_at,
+        )
+        .order_by(User.created_at.desc())
+        .yield_per(1000)
+    )
 
     return [
         {
@@ -29,19 +41,29 @@ def list_users(db: Session = Depends(get_db)):
     ]
 
 
+def update_user_row(db: Session, user_id: str, **values):
+    """
+    Single UPDATE ... RETURNING: validates existence and writes in one hop.
+    Shared with the user actions in app.routes.admin.
+    """
+    row = db.execute(
+        update(User).where(User.id == user_id).values(**values).returning(User.id, User.role)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found")
+    db.commit()
+    invalidate_user_cache(row.id)   # Core UPDATE skips the mapper events
+    return row
+
+
 # =====================================================
 # ADMIN: DISABLE USER
 # =====================================================
 @router.post("/{user_id}/disable", dependencies=[Depends(require_admin)])
 def disable_user(user_id: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    user.is_active = False
-    db.commit()
+    row = update_user_row(db, user_id, is_active=False)
 
-    return {"id": str(user.id), "status": "disabled"}
+    return {"id": str(row.id), "status": "disabled"}
 
 
 # =====================================================
@@ -49,14 +71,9 @@ def disable_user(user_id: str, db: Session = Depends(get_db)):
 # =====================================================
 @router.post("/{user_id}/enable", dependencies=[Depends(require_admin)])
 def enable_user(user_id: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    user.is_active = True
-    db.commit()
+    row = update_user_row(db, user_id, is_active=True)
 
-    return {"id": str(user.id), "status": "enabled"}
+    return {"id": str(row.id), "status": "enabled"}
 
 
 # =====================================================
@@ -65,17 +82,9 @@ def enable_user(user_id: str, db: Session = Depends(get_db)):
 @router.post("/{user_id}/role", dependencies=[Depends(require_admin)])
 def change_role(
     user_id: str,
-    role: str,
+    role: Literal["user", "admin"],
     db: Session = Depends(get_db),
 ):
-    if role not in {"user", "admin"}:
-        raise HTTPException(status_code=400, detail="Invalid role")
-
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    user.role = role
-    db.commit()
+    row = update_user_row(db, user_id, role=role)
 
-    return {"id": str(user.id), "role": user.role}
+    return {"id": str(row.id), "role": row.role}
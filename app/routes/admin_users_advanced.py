@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 from pydantic import BaseModel
 from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
 from app.database import get_db
 from app.models import User, AuditLog, UserSession
-from app.dependencies import require_admin
+from app.dependencies import private_short_cache, require_admin
+from app.audit import queue_audit_log
 
 router = APIRouter(prefix="/admin", tags=["admin-users-advanced"])
 
@@ -28,22 +31,43 @@ def force_password_reset(user_id: str, payload: ForcePasswordResetPayload, db: S
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(404, "User not found")
-    log = AuditLog(admin_id=admin.id, action="force_password_reset", entity_type="user", entity_id=str(user_id), meta={"reason": payload.reason, "admin_email": admin.email})
-    db.add(log)
+    queue_audit_log(db, admin_id=admin.id, action="force_password_reset", entity_type="user", entity_id=str(user_id), meta={"reason": payload.reason, "admin_email": admin.email})
     db.commit()
     return {"message": "Password reset initiated", "user_id": str(user_id)}
 
 @router.get("/users/{user_id}/activity", status_code=status.HTTP_200_OK)
 def get_user_activity(user_id: str, limit: int = 50, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
-    logs = db.query(AuditLog).filter(AuditLog.entity_type == "user", AuditLog.entity_id == str(user_id)).order_by(AuditLog.created_at.desc()).limit(limit).all()
-    return [{"id": str(l.id), "action": l.action, "created_at": l.created_at, "admin_email": l.admin.email if l.admin else None} for l in logs]
+    logs = (
+        db.query(AuditLog.id, AuditLog.action, AuditLog.created_at, User.email.label("admin_email"))
+        .outerjoin(User, User.id == AuditLog.admin_id)
+        .filter(AuditLog.entity_type == "user", AuditLog.entity_id == str(user_id))
+        .order_by(AuditLog.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+    return [{"id": str(l.id), "action": l.action, "created_at": l.created_at, "admin_email": l.admin_email} for l in logs]
 
-@router.get("/sessions", status_code=status.HTTP_200_OK)
-def get_all_sessions(active_only: bool = True, db: Session = Depends(get_db), admin: User = Depends(require_admin)):
-    query = db.query(UserSession)
+@router.get("/sessions", status_code=status.HTTP_200_OK, dependencies=[Depends(private_short_cache)])
+def get_all_sessions(
+    active_only: bool = True,
+    limit: int = Query(100, ge=1, le=500),
+    before_last_activity: Optional[datetime] = None,
+    before_id: Optional[UUID] = None,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    # Keyset pagination: pass last_activity + id of the last row to continue.
+    query = db.query(
+        UserSession.id, UserSession.user_id, UserSession.ip_address, UserSession.device_type,
+        UserSession.last_activity, UserSession.expires_at,
+    )
     if active_only:
-        query = query.filter(UserSession.expires_at > datetime.utcnow())
-    sessions = query.order_by(UserSession.last_activity.desc()).limit(100).all()
+        query = query.filter(UserSession.expires_at > func.now())
+    if before_last_activity and before_id:
+        query = query.filter(
+            tuple_(UserSession.last_activity, UserSession.id) < tuple_(before_last_activity, before_id)
+        )
+    sessions = query.order_by(UserSession.last_activity.desc(), UserSession.id.desc()).limit(limit).all()
     return [{"id": str(s.id), "user_id": str(s.user_id), "ip_address": s.ip_address, "device_type": s.device_type, "last_activity": s.last_activity, "expires_at": s.expires_at} for s in sessions]
 
 @router.delete("/sessions/{session_id}", status_code=status.HTTP_200_OK)
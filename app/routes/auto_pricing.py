@@ -9,7 +9,7 @@ WHAT CHANGED vs the old version:
   ✅ PriceProposal table: full audit trail of every AI suggestion + approval
   ✅ Atomic approve: price + is_priced + priced_by + priced_at saved in ONE commit
   ✅ Exchange rate is fetched once, locked into the proposal — no drift between products
-  ✅ Rate cap: max 5 concurrent AI searches per deployment (asyncio.Semaphore)
+  ✅ Rate cap: AI_MAX_CONCURRENT in flight + AI_RPM per minute (semaphore + leaky bucket)
   ✅ Sync Anthropic fallback removed — uses AsyncAnthropic only
   ✅ Delete-from-pricing: soft-delete a product directly from the pricing tool
   ✅ priced_by (admin user id) stored on every approval
@@ -18,6 +18,9 @@ WHAT CHANGED vs the old version:
 ENDPOINTS:
   GET  /api/products/admin/auto-price/rate
   POST /api/products/admin/auto-price/propose      ← AI searches, saves proposal, does NOT set is_priced
+  POST /api/products/admin/auto-price/propose-bulk ← Same for many products (concurrent searches, one commit)
+  POST /api/products/admin/auto-price/propose-batch-async      ← Submit a Message Batch (half cost, ≤24h)
+  GET  /api/products/admin/auto-price/batch/{batch_id}/poll    ← Import batch results as pending proposals
   POST /api/products/admin/auto-price/approve      ← Admin approves a proposal → atomic write
   POST /api/products/admin/auto-price/reject       ← Admin rejects a proposal
   GET  /api/products/admin/auto-price/proposals/{product_id}  ← Proposal history for one product
@@ -25,24 +28,35 @@ ENDPOINTS:
 
 ENV VARS:
   ANTHROPIC_API_KEY   -- required, never exposed to browser
+  ANTHROPIC_MODEL     -- first-try model (default: claude-3-5-haiku-20241022)
+  ANTHROPIC_FALLBACK_MODEL -- retry model for not-found / low-confidence (default: claude-sonnet-4-20250514)
+  AI_MAX_CONCURRENT   -- concurrent AI searches (default 5; shared across workers when REDIS_URL is set)
+  AI_RPM              -- AI search requests per minute (default 50)
+  AI_ADMIN_RPM        -- /propose + /propose-bulk calls per admin per minute (default 60; 429 past it)
+  FX_CACHE_TTL        -- seconds a live INR→LSL rate is reused (default 600)
 """
 
 import os
 import json
 import re
 import asyncio
-import httpx
+import hashlib
+import time
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel, Field
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.dependencies import require_admin as get_current_admin
-from app.models import Product, PriceProposal
+from app.models import Product, PriceProposal, PriceProposalBatch, PricingStatus, ProposalStatus
+from app.http_clients import anthropic_http_client, fx_client
+from app.redis_client import async_cache_get, async_cache_incr, async_cache_set, distributed_semaphore
 
 # ── Anthropic (async only) ────────────────────────────────────────────────────
 try:
@@ -53,8 +67,120 @@ except ImportError:
 
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 
-# Max concurrent AI searches — prevents blowing Anthropic rate limits on bulk runs
-_AI_SEMAPHORE = asyncio.Semaphore(5)
+# Two separate caps on AI searches:
+#   AI_MAX_CONCURRENT — searches in flight at once (bounds memory / open sockets)
+#   AI_RPM            — request starts per minute, spaced evenly (account rate limit)
+AI_MAX_CONCURRENT = int(os.getenv("AI_MAX_CONCURRENT", "5"))
+AI_RPM            = int(os.getenv("AI_RPM", "50"))
+
+
+class _LeakyBucket:
+    """
+    Async rate limiter: lets one request through every period/max_rate
+    seconds. A semaphore alone only limits concurrency — fast responses
+    would still burst past the per-minute limit.
+    """
+
+    def __init__(self, max_rate: int, time_period: float = 60.0):
+        self._interval  = time_period / max(max_rate, 1)
+        self._next_slot = 0.0
+        self._lock      = asyncio.Lock()
+
+    async def __aenter__(self):
+        async with self._lock:
+            now  = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _CircuitBreaker:
+    """
+    Fast-fails AI searches during an Anthropic outage instead of letting each
+    one wait out its timeouts. After `threshold` consecutive upstream failures
+    (network errors / 5xx) the circuit opens for `reset_after` seconds; then a
+    single probe is let through — success closes it, failure re-opens it.
+
+    No lock: state only changes in synchronous sections, which the event
+    loop never interleaves.
+    """
+
+    def __init__(self, threshold: int = 5, reset_after: float = 60.0):
+        self._threshold      = threshold
+        self._reset_after    = reset_after
+        self._failures       = 0
+        self._opened_at      = None
+        self._probe_inflight = False
+
+    @staticmethod
+    def _is_upstream_failure(exc: Exception) -> bool:
+        if not _anthropic_ok:
+            return False
+        return isinstance(exc, _anthropic_lib.APIConnectionError) or (
+            isinstance(exc, _anthropic_lib.APIStatusError) and exc.status_code >= 500
+        )
+
+    def _admit(self) -> bool:
+        """Returns True if this call is the half-open probe; raises if open."""
+        if self._opened_at is None:
+            return False
+        remaining = self._reset_after - (time.monotonic() - self._opened_at)
+        if self._probe_inflight or remaining > 0:
+            raise RuntimeError(
+                f"AI service unavailable — retrying in {max(int(remaining), 1)}s"
+            )
+        self._probe_inflight = True
+        return True
+
+    @asynccontextmanager
+    async def guard(self):
+        probe = self._admit()
+        try:
+            yield
+        except Exception as e:
+            if self._is_upstream_failure(e):
+                self._failures += 1
+                if probe or self._failures >= self._threshold:
+                    self._opened_at = time.monotonic()
+            else:
+                self._failures, self._opened_at = 0, None   # the API answered (4xx)
+            raise
+        else:
+            self._failures, self._opened_at = 0, None
+        finally:
+            if probe:
+                self._probe_inflight = False
+
+
+_AI_SEMAPHORE    = asyncio.Semaphore(AI_MAX_CONCURRENT)
+_AI_RATE_LIMITER = _LeakyBucket(AI_RPM)
+_AI_BREAKER      = _CircuitBreaker()
+
+# The bucket above paces upstream calls but queues forever; this rejects a
+# runaway client outright. Fixed one-minute windows, counted in Redis when
+# configured (shared by all workers), otherwise per process.
+AI_ADMIN_RPM = int(os.getenv("AI_ADMIN_RPM", "60"))
+_AI_QUOTA: dict = {}   # (admin_id, window) -> calls
+
+
+async def _ai_admin_quota(admin = Depends(get_current_admin)) -> None:
+    now    = time.time()
+    window = int(now // 60)
+    count  = await async_cache_incr(f"ai_quota:{admin.id}:{window}", 60)
+    if count is None:
+        for key in [k for k in _AI_QUOTA if k[1] != window]:
+            del _AI_QUOTA[key]
+        count = _AI_QUOTA[(admin.id, window)] = _AI_QUOTA.get((admin.id, window), 0) + 1
+    if count > AI_ADMIN_RPM:
+        raise HTTPException(
+            status_code=429,
+            detail=f"AI pricing limit reached ({AI_ADMIN_RPM}/min) — try again shortly",
+            headers={"Retry-After": str(60 - int(now) % 60)},
+        )
 
 router = APIRouter(tags=["Admin -- Auto Pricing"])
 
@@ -97,79 +223,196 @@ def calculate_price(market_inr: float, exchange_rate: float) -> dict:
 # ══════════════════════════════════════════════════════════════════════════════
 
 FALLBACK_RATE = 0.21
+RATE_CACHE_TTL = int(os.getenv("FX_CACHE_TTL", "600"))   # seconds
 
+# ✅ module-level cache — a bulk run of N proposals makes one rate request
+_RATE_CACHE = {"ts": 0.0, "rate": None, "source": None}
+_RATE_LOCK  = asyncio.Lock()
+_RATE_REDIS_KEY = "fx:inr_lsl"
 
-async def fetch_exchange_rate() -> tuple[float, str]:
-    """
-    Returns (rate, source) where source is "live" or "fallback".
-    Always returns — never raises.
-    """
+
+async def _fetch_exchange_rate_uncached() -> tuple[float, str]:
     for url in [
         "https://api.exchangerate-api.com/v4/latest/INR",
         "https://open.er-api.com/v6/latest/INR",
     ]:
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                r = await client.get(url)
-                if r.status_code == 200:
-                    rate = r.json().get("rates", {}).get("LSL")
-                    if rate and float(rate) > 0:
-                        return float(rate), "live"
+            r = await fx_client.get(url)
+            if r.status_code == 200:
+                rate = r.json().get("rates", {}).get("LSL")
+                if rate and float(rate) > 0:
+                    return float(rate), "live"
         except Exception:
             continue
     return FALLBACK_RATE, "fallback"
 
 
+async def fetch_exchange_rate() -> tuple[float, str]:
+    """
+    Returns (rate, source) where source is "live" or "fallback".
+    Always returns — never raises.
+
+    Cached for RATE_CACHE_TTL; concurrent callers on a miss wait on the lock
+    and reuse the one result instead of each hitting the network. With Redis
+    the live rate is shared too, and only one worker at a time refreshes it.
+    """
+    if time.monotonic() - _RATE_CACHE["ts"] < RATE_CACHE_TTL:
+        return _RATE_CACHE["rate"], _RATE_CACHE["source"]
+
+    async with _RATE_LOCK:
+        if time.monotonic() - _RATE_CACHE["ts"] < RATE_CACHE_TTL:
+            return _RATE_CACHE["rate"], _RATE_CACHE["source"]
+        async with distributed_semaphore("fx_refresh", 1, lease=15, max_wait=6):
+            shared = await async_cache_get(_RATE_REDIS_KEY)
+            if shared is not None:
+                rate, source = float(shared), "live"
+            else:
+                rate, source = await _fetch_exchange_rate_uncached()
+                if source == "live":
+                    await async_cache_set(_RATE_REDIS_KEY, rate, RATE_CACHE_TTL)
+        # Only a live rate is cached; after a fallback the next call retries.
+        if source == "live":
+            _RATE_CACHE.update(ts=time.monotonic(), rate=rate, source=source)
+        return rate, source
+
+
+async def close_http_clients() -> None:
+    global _ANTHROPIC_CLIENT
+    if _ANTHROPIC_CLIENT is not None:
+        await _ANTHROPIC_CLIENT.close()
+        _ANTHROPIC_CLIENT = None
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # CLAUDE AI PRICE SEARCH  (async, semaphore-guarded)
 # ══════════════════════════════════════════════════════════════════════════════
 
-async def search_india_price(title: str, brand: Optional[str], category: Optional[str]) -> dict:
-    """
-    Uses Claude (AsyncAnthropic) with web_search to find the real INR price
-    on Indian e-commerce.
+# Price lookup is a simple task — Haiku answers most of it; Sonnet only
+# retries what Haiku couldn't find or was unsure about.
+AI_MODEL_DEFAULT  = os.getenv("ANTHROPIC_MODEL", "claude-3-5-haiku-20241022")
+AI_MODEL_FALLBACK = os.getenv("ANTHROPIC_FALLBACK_MODEL", "claude-sonnet-4-20250514")
+AI_MAX_TOKENS = 300
+
+WEB_SEARCH_TOOL = {"type": "web_search_20250305", "name": "web_search"}
+
+# The model reports its answer by calling this tool, so the SDK hands back
+# a typed dict (block.input) instead of JSON embedded in free text.
+RECORD_PRICE_TOOL = {
+    "name": "record_price",
+    "description": "Record the retail price found for the product. Call exactly once.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "inr_price":  {"type": ["number", "null"], "description": "Price in INR, or null if not found"},
+            "source":     {"type": "string", "description": "Site the price came from, or \"not found\""},
+            "confidence": {"type": "string", "enum": ["high", "medium", "low"]},
+        },
+        "required": ["inr_price", "source", "confidence"],
+    },
+}
+AI_TOOLS = [WEB_SEARCH_TOOL, RECORD_PRICE_TOOL]
+
+# Fallback for replies that put the JSON in text instead of calling record_price
+_PRICE_JSON_RE = re.compile(r'\{[^{}]*"inr_price"[^{}]*\}')
+
+
+# Created on first use and reused — keeps its connection pool warm across
+# searches instead of a new TLS handshake per call. Closed on shutdown.
+_ANTHROPIC_CLIENT = None
+
+
+def _get_client():
+    global _ANTHROPIC_CLIENT
+    if _ANTHROPIC_CLIENT is None:
+        _ANTHROPIC_CLIENT = _anthropic_lib.AsyncAnthropic(
+            api_key=ANTHROPIC_API_KEY,
+            max_retries=2,
+            http_client=anthropic_http_client,   # timeouts come from the client
+        )
+    return _ANTHROPIC_CLIENT
 
-    Returns { inr_price, source, confidence }
-    Raises ValueError if price not found.
-    Raises RuntimeError on API/config errors.
-    """
+
+def _check_ai_configured() -> None:
     if not ANTHROPIC_API_KEY:
         raise RuntimeError("ANTHROPIC_API_KEY is not configured on the server")
     if not _anthropic_ok:
         raise RuntimeError("anthropic package not installed — run: pip install anthropic")
 
+
+# Identical for every product — sent as a cached system block so bulk runs
+# pay full price for it once per cache window (tools + system form the prefix).
+PRICE_INSTRUCTIONS = (
+    "You find current retail prices in Indian Rupees for products.\n\n"
+    "Search Amazon.in, Flipkart.com, or Nykaa.com, then call record_price.\n"
+    '- "high"   = exact product found on Amazon.in / Flipkart / Nykaa\n'
+    '- "medium" = similar product or less reliable source\n'
+    '- "low"    = estimating from category averages\n'
+    '- Not found: inr_price null, source "not found", confidence "low"'
+)
+AI_SYSTEM = [{"type": "text", "text": PRICE_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}}]
+
+
+def _price_prompt(title: str, brand: Optional[str], category: Optional[str]) -> str:
     query = " ".join(p for p in [brand, title, category] if p)
+    return f'Product: "{query}"'
 
-    prompt = (
-        f'Find the current retail price in Indian Rupees for: "{query}"\n\n'
-        "Search Amazon.in, Flipkart.com, or Nykaa.com.\n"
-        "Return ONLY valid JSON — no markdown, no preamble, no explanation:\n"
-        '{"inr_price": <number or null>, "source": "<site>", "confidence": "high|medium|low"}\n\n'
-        '- "high"   = exact product found on Amazon.in / Flipkart / Nykaa\n'
-        '- "medium" = similar product or less reliable source\n'
-        '- "low"    = estimating from category averages\n'
-        '- Not found: {"inr_price": null, "source": "not found", "confidence": "low"}'
-    )
 
-    async with _AI_SEMAPHORE:
-        client = _anthropic_lib.AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
-        response = await client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=300,
-            tools=[{"type": "web_search_20250305", "name": "web_search"}],
-            messages=[{"role": "user", "content": prompt}],
-        )
+def _price_request_params(
+    title: str, brand: Optional[str], category: Optional[str], model: str = AI_MODEL_DEFAULT,
+) -> dict:
+    """messages.create() kwargs — shared by the realtime and Message Batches paths."""
+    # tool_choice stays "auto": forcing record_price would skip the web search.
+    return {
+        "model":       model,
+        "max_tokens":  AI_MAX_TOKENS,
+        "temperature": 0,
+        "system":      AI_SYSTEM,
+        "tools":       AI_TOOLS,
+        "messages":    [{"role": "user", "content": _price_prompt(title, brand, category)}],
+    }
 
-    # Collect text blocks only — skip tool_use/tool_result blocks
-    text = "\n".join(
-        block.text for block in response.content if hasattr(block, "text")
-    )
 
-    match = re.search(r'\{[^{}]*"inr_price"[^{}]*\}', text, re.DOTALL)
+def _price_json_from_text(text: str) -> Optional[dict]:
+    """
+    Whole reply as JSON first — that also covers the answer wrapped in a
+    parent object, which the flat regex can't match — then the regex.
+    """
+    try:
+        parsed = json.loads(text.strip())
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, dict):
+        if "inr_price" in parsed:
+            return parsed
+        for value in parsed.values():
+            if isinstance(value, dict) and "inr_price" in value:
+                return value
+
+    match = _PRICE_JSON_RE.search(text)
     if not match:
-        raise ValueError(f"No price data returned by AI for: {title[:60]}")
+        return None
+    try:
+        return json.loads(match.group(0))
+    except ValueError:
+        return None
+
+
+def _parse_price_response(content, title: str) -> dict:
+    """Extract { inr_price, source, confidence } from a message's content blocks."""
+    data = next(
+        (
+            block.input for block in content
+            if getattr(block, "type", None) == "tool_use" and block.name == "record_price"
+        ),
+        None,
+    )
+    if data is None:
+        # Model answered in text instead of calling the tool
+        text = "\n".join(block.text for block in content if hasattr(block, "text"))
+        data = _price_json_from_text(text)
+        if data is None:
+            raise ValueError(f"No price data returned by AI for: {title[:60]}")
 
-    data = json.loads(match.group(0))
     if not data.get("inr_price"):
         raise ValueError(f"Product not found on Indian sites: {title[:60]}")
 
@@ -180,6 +423,58 @@ async def search_india_price(title: str, brand: Optional[str], category: Optiona
     }
 
 
+async def _search_once(title: str, brand: Optional[str], category: Optional[str], model: str) -> dict:
+    # Breaker first: with the circuit open, fail before queueing for a slot
+    async with _AI_BREAKER.guard(), _AI_SEMAPHORE, \
+               distributed_semaphore("ai_search", AI_MAX_CONCURRENT), _AI_RATE_LIMITER:
+        response = await _get_client().messages.create(**_price_request_params(title, brand, category, model))
+    return _parse_price_response(response.content, title)
+
+
+async def search_india_price(
+    title: str, brand: Optional[str], category: Optional[str], model: str = AI_MODEL_DEFAULT,
+) -> dict:
+    """
+    Uses Claude (AsyncAnthropic) with web_search to find the real INR price
+    on Indian e-commerce. Tries `model` first and retries once with
+    AI_MODEL_FALLBACK when the price isn't found or confidence is "low".
+
+    Returns { inr_price, source, confidence }
+    Raises ValueError if price not found.
+    Raises RuntimeError on API/config errors.
+    """
+    _check_ai_configured()
+
+    try:
+        result = await _search_once(title, brand, category, model)
+        if result["confidence"] != "low" or model == AI_MODEL_FALLBACK:
+            return result
+    except ValueError:
+        if model == AI_MODEL_FALLBACK:
+            raise
+
+    return await _search_once(title, brand, category, AI_MODEL_FALLBACK)
+
+
+# Searches in flight, keyed by (product_id, normalised title). A second
+# "AI Suggest" click for the same product — another admin, another tab —
+# awaits the running search instead of paying for a second one.
+_INFLIGHT: dict = {}
+
+
+async def search_india_price_coalesced(
+    product_id: str, title: str, brand: Optional[str], category: Optional[str],
+) -> dict:
+    key  = (product_id, title.lower().strip())
+    task = _INFLIGHT.get(key)
+    if task is None or task.done():
+        task = asyncio.ensure_future(search_india_price(title=title, brand=brand, category=category))
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda t, key=key: _INFLIGHT.pop(key, None) if _INFLIGHT.get(key) is t else None)
+    # shield: one caller disconnecting must not cancel the search for the others
+    return await asyncio.shield(task)
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # SCHEMAS
 # ══════════════════════════════════════════════════════════════════════════════
@@ -191,6 +486,10 @@ class ProposeRequest(BaseModel):
     category:   Optional[str] = None
 
 
+class ProposeBulkRequest(BaseModel):
+    items: List[ProposeRequest] = Field(..., min_length=1, max_length=200)
+
+
 class ApproveRequest(BaseModel):
     proposal_id: str   # UUID of the PriceProposal row to approve
 
@@ -204,8 +503,77 @@ class DeleteFromPricingRequest(BaseModel):
     reason: Optional[str] = None   # optional note for audit log
 
 
+def _as_uuid(value, not_found: str) -> uuid.UUID:
+    """Parse a path/body id; a malformed one is simply "not found"."""
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        raise HTTPException(404, not_found)
+
+
+async def _existing_product_ids(db: AsyncSession, ids) -> set:
+    """Subset of `ids` (strings) that are live products; malformed ids are dropped."""
+    parsed = set()
+    for pid in ids:
+        try:
+            parsed.add(uuid.UUID(str(pid)))
+        except ValueError:
+            continue
+    if not parsed:
+        return set()
+    rows = await db.scalars(select(Product.id).where(
+        Product.id.in_(parsed),
+        Product.is_deleted == False,
+    ))
+    return {str(pid) for pid in rows}
+
+
+def _supersede_pending(product_ids):
+    """UPDATE that expires every pending proposal for the given product(s)."""
+    return (
+        update(PriceProposal)
+        .where(
+            PriceProposal.product_id.in_(product_ids),
+            PriceProposal.status     == ProposalStatus.pending,
+        )
+        .values(status=ProposalStatus.superseded)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _approved_proposal_row(
+    product_id, admin_id, now: datetime,
+    price_lsl: float, compare_lsl: float,
+    exchange_rate: float = FALLBACK_RATE, inr_price: float = 0,
+    source: str = "manual",
+) -> dict:
+    """
+    Column values for an admin-entered, already-approved PriceProposal.
+    `now` is the request's single timestamp so every row of a bulk call
+    shares the same approved_at.
+    """
+    return {
+        "product_id":        product_id,
+        "proposed_by":       admin_id,
+        "inr_price":         inr_price,
+        "source":            source,
+        "confidence":        "high",
+        "exchange_rate":     exchange_rate,
+        "rate_source":       "manual",
+        "final_price_lsl":   price_lsl,
+        "compare_price_lsl": compare_lsl,
+        "discount_pct":      round(((compare_lsl - price_lsl) / compare_lsl) * 100) if compare_lsl else 0,
+        "margin_pct":        round((PROFIT_INR * exchange_rate / price_lsl) * 100, 1) if price_lsl else 0,
+        "status":            ProposalStatus.approved,
+        "approved_by":       admin_id,
+        "approved_at":       now,
+    }
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # ENDPOINTS
+# All DB endpoints run on AsyncSession so DB waits overlap with AI / HTTP
+# waits on the event loop instead of holding a threadpool thread each.
 # ══════════════════════════════════════════════════════════════════════════════
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -213,13 +581,13 @@ class DeleteFromPricingRequest(BaseModel):
 # ══════════════════════════════════════════════════════════════════════════════
 
 @router.get("/products/admin/pricing/all")
-def list_all_products_for_pricing(
+async def list_all_products_for_pricing(
     search:   str  = "",
     category: str  = "",
     brand:    str  = "",
     limit:    int  = 2000,
     offset:   int  = 0,
-    db:       Session = Depends(get_db),
+    db:       AsyncSession = Depends(get_async_db),
     admin = Depends(get_current_admin),
 ):
     """
@@ -227,43 +595,57 @@ def list_all_products_for_pricing(
     Used exclusively by the Admin Pricing Tool frontend.
     Results are sorted: unpriced first, then ai_suggested, then admin_approved.
     """
-    from sqlalchemy import or_, case as sql_case
-
-    q = db.query(Product).filter(Product.is_deleted == False)
+    # Plain column rows — no ORM identity map / attribute instrumentation per product
+    q = select(
+        Product.id,
+        Product.title,
+        Product.brand,
+        Product.category,
+        Product.main_category,
+        Product.price,
+        Product.compare_price,
+        Product.stock,
+        Product.status,
+        Product.is_priced,
+        Product.pricing_status,
+        Product.priced_at,
+        Product.main_image,
+    ).where(Product.is_deleted == False)
 
     if search:
-        q = q.filter(Product.title.ilike(f"%{search}%"))
+        q = q.where(Product.title.ilike(f"%{search}%"))
     if category:
-        q = q.filter(Product.category == category)
+        q = q.where(Product.category == category)
     if brand:
-        q = q.filter(Product.brand == brand)
+        q = q.where(Product.brand == brand)
 
-    total = q.count()
+    total = await db.scalar(select(func.count()).select_from(q.subquery()))
 
     # Sort: unpriced/rejected first → ai_suggested → admin_approved
-    order_expr = sql_case(
-        (Product.pricing_status == "admin_approved", 2),
-        (Product.pricing_status == "ai_suggested",   1),
-        else_=0,
+    # (pricing_sort_key is a generated column; idx_products_pricing_sort covers it)
+    rows = await db.stream(
+        q.order_by(Product.pricing_sort_key, Product.title)
+        .offset(offset)
+        .limit(limit)
+        .execution_options(yield_per=500)
     )
-    products = q.order_by(order_expr, Product.title).offset(offset).limit(limit).all()
 
     results = [
         {
             "id":             str(p.id),
             "title":          p.title,
-            "brand":          getattr(p, "brand", None),
-            "category":       getattr(p, "category", None) or getattr(p, "main_category", None),
+            "brand":          p.brand,
+            "category":       p.category or p.main_category,
             "price":          p.price,
             "compare_price":  p.compare_price,
-            "stock":          getattr(p, "stock", 0) or 0,
+            "stock":          p.stock or 0,
             "status":         str(p.status) if p.status else "active",
             "is_priced":      bool(p.is_priced),
-            "pricing_status": p.pricing_status or ("admin_approved" if p.is_priced else "unpriced"),
+            "pricing_status": p.pricing_status or (PricingStatus.admin_approved if p.is_priced else PricingStatus.unpriced),
             "priced_at":      p.priced_at.isoformat() if p.priced_at else None,
             "main_image":     p.main_image,
         }
-        for p in products
+        async for p in rows
     ]
 
     return {"results": results, "total": total, "loaded": len(results)}
@@ -276,8 +658,8 @@ def list_all_products_for_pricing(
 # ══════════════════════════════════════════════════════════════════════════════
 
 @router.post("/products/admin/pricing/reset-bulk-unpriced")
-def reset_bulk_priced_to_unpriced(
-    db:    Session = Depends(get_db),
+async def reset_bulk_priced_to_unpriced(
+    db:    AsyncSession = Depends(get_async_db),
     admin = Depends(get_current_admin),
 ):
     """
@@ -286,9 +668,7 @@ def reset_bulk_priced_to_unpriced(
 
     Safe to run multiple times — only touches products with no admin who approved them.
     """
-    from sqlalchemy import text as _text
-
-    result = db.execute(_text("""
+    result = await db.execute(text("""
         UPDATE products
         SET
             is_priced      = FALSE,
@@ -298,7 +678,7 @@ def reset_bulk_priced_to_unpriced(
           AND is_priced   = TRUE
           AND priced_by   IS NULL
     """))
-    db.commit()
+    await db.commit()
 
     affected = result.rowcount
     return {
@@ -313,28 +693,51 @@ def reset_bulk_priced_to_unpriced(
 # ══════════════════════════════════════════════════════════════════════════════
 
 @router.get("/products/admin/pricing/poll")
-def poll_pricing_status(
-    db:    Session = Depends(get_db),
+async def poll_pricing_status(
+    request:  Request,
+    response: Response,
+    db:    AsyncSession = Depends(get_async_db),
     admin = Depends(get_current_admin),
 ):
     """
     Returns minimal pricing status for ALL non-deleted products.
     Very cheap query — only 5 columns, no joins.
     Frontend uses this every 30s to sync approvals made on another device.
+
+    A weak ETag is derived from one aggregate row over the same columns, so
+    an unchanged catalogue answers 304 without fetching or serialising rows.
     """
-    items = db.query(
+    signature = (await db.execute(select(
+        func.count(Product.id),
+        func.count().filter(Product.is_priced == True),
+        func.count().filter(Product.pricing_status == PricingStatus.admin_approved),
+        func.count().filter(Product.pricing_status == PricingStatus.admin_rejected),
+        func.count().filter(Product.pricing_status == PricingStatus.ai_suggested),
+        func.sum(Product.price),
+        func.sum(Product.compare_price),
+        func.max(Product.priced_at),
+        func.max(Product.updated_at),
+    ).where(Product.is_deleted == False))).one()
+    etag = 'W/"%s"' % hashlib.blake2b(repr(tuple(signature)).encode(), digest_size=8).hexdigest()
+
+    headers = {"Cache-Control": "private, max-age=5", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    items = (await db.execute(select(
         Product.id,
         Product.pricing_status,
         Product.is_priced,
         Product.price,
         Product.compare_price,
-    ).filter(Product.is_deleted == False).all()
+    ).where(Product.is_deleted == False))).all()
 
     return {
         "items": [
             {
                 "id":             str(r.id),
-                "pricing_status": r.pricing_status or ("admin_approved" if r.is_priced else "unpriced"),
+                "pricing_status": r.pricing_status or (PricingStatus.admin_approved if r.is_priced else PricingStatus.unpriced),
                 "is_priced":      bool(r.is_priced),
                 "price":          r.price,
                 "compare_price":  r.compare_price,
@@ -356,10 +759,10 @@ async def get_rate(admin=Depends(get_current_admin)):
     }
 
 
-@router.post("/products/admin/auto-price/propose")
+@router.post("/products/admin/auto-price/propose", dependencies=[Depends(_ai_admin_quota)])
 async def propose_price(
     req:   ProposeRequest,
-    db:    Session = Depends(get_db),
+    db:    AsyncSession = Depends(get_async_db),
     admin = Depends(get_current_admin),
 ):
     """
@@ -372,27 +775,30 @@ async def propose_price(
     HTTP codes:
       200  = proposal saved, awaiting admin approval
       422  = product genuinely not found on Indian sites (not_found, skip it)
+      429  = this admin hit AI_ADMIN_RPM (retry after the Retry-After header)
       503  = AI / network error (transient, can retry)
     """
-    product = db.query(Product).filter(
-        Product.id       == req.product_id,
+    product_id = _as_uuid(req.product_id, f"Product {req.product_id} not found")
+    exists = await db.scalar(select(Product.id).where(
+        Product.id         == product_id,
         Product.is_deleted == False,
-    ).first()
-    if not product:
+    ))
+    if not exists:
         raise HTTPException(status_code=404, detail=f"Product {req.product_id} not found")
-
-    # Fetch exchange rate once — lock it into this proposal so all maths are consistent
-    exchange_rate, rate_source = await fetch_exchange_rate()
-
-    # AI search
-    try:
-        price_data = await search_india_price(
-            title=req.title, brand=req.brand, category=req.category,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=422, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=f"AI search error: {str(e)}")
+    # Hand the connection back while the AI search runs (can take many seconds)
+    await db.commit()
+
+    # Exchange rate (locked into this proposal so all maths are consistent) and
+    # AI search are independent — run them side by side.
+    (exchange_rate, rate_source), price_data = await asyncio.gather(
+        fetch_exchange_rate(),
+        search_india_price_coalesced(req.product_id, req.title, req.brand, req.category),
+        return_exceptions=True,
+    )
+    if isinstance(price_data, ValueError):
+        raise HTTPException(status_code=422, detail=str(price_data))
+    if isinstance(price_data, BaseException):
+        raise HTTPException(status_code=503, detail=f"AI search error: {str(price_data)}")
 
     pricing = calculate_price(
         market_inr=price_data["inr_price"],
@@ -400,14 +806,12 @@ async def propose_price(
     )
 
     # Expire any existing pending proposals for this product
-    db.query(PriceProposal).filter(
-        PriceProposal.product_id == req.product_id,
-        PriceProposal.status     == "pending",
-    ).update({"status": "superseded"}, synchronize_session=False)
+    await db.execute(_supersede_pending([product_id]))
 
     # Create new proposal — does NOT touch product row
     proposal = PriceProposal(
-        product_id        = req.product_id,
+        id                = uuid.uuid4(),
+        product_id        = product_id,
         proposed_by       = admin.id,
         inr_price         = price_data["inr_price"],
         source            = price_data["source"],
@@ -418,11 +822,10 @@ async def propose_price(
         compare_price_lsl = pricing["compare_price_lsl"],
         discount_pct      = pricing["discount_pct"],
         margin_pct        = pricing["margin_pct"],
-        status            = "pending",
+        status            = ProposalStatus.pending,
     )
     db.add(proposal)
-    db.commit()
-    db.refresh(proposal)
+    await db.commit()
 
     return {
         "proposal_id":     str(proposal.id),
@@ -442,10 +845,285 @@ async def propose_price(
     }
 
 
+@router.post("/products/admin/auto-price/propose-bulk", dependencies=[Depends(_ai_admin_quota)])
+async def propose_price_bulk(
+    req:   ProposeBulkRequest,
+    db:    AsyncSession = Depends(get_async_db),
+    admin = Depends(get_current_admin),
+):
+    """
+    Stage 1 for many products at once.
+
+    AI searches run concurrently (still capped by _AI_SEMAPHORE); the exchange
+    rate is fetched once for the whole batch and all proposals are written in
+    one commit. A failed search only fails its own item.
+
+    Each result carries status "pending" (proposal saved), "not_found"
+    (the 422 case of /propose), or "error" (the 503 case — retryable).
+    """
+    # Last entry wins if a product_id is sent twice
+    items = list({it.product_id: it for it in req.items}.values())
+    ids   = [it.product_id for it in items]
+
+    found = await _existing_product_ids(db, ids)
+    await db.commit()   # release the connection during the AI searches
+
+    to_search = [it for it in items if it.product_id in found]
+    (exchange_rate, rate_source), outcomes = await asyncio.gather(
+        fetch_exchange_rate(),
+        asyncio.gather(
+            *[
+                search_india_price_coalesced(it.product_id, it.title, it.brand, it.category)
+                for it in to_search
+            ],
+            return_exceptions=True,
+        ),
+    )
+
+    results   = [
+        {"product_id": pid, "status": "error", "detail": "Product not found"}
+        for pid in ids if pid not in found
+    ]
+    proposals = []
+    for it, outcome in zip(to_search, outcomes):
+        if isinstance(outcome, ValueError):
+            results.append({"product_id": it.product_id, "status": "not_found", "detail": str(outcome)})
+            continue
+        if isinstance(outcome, BaseException):
+            results.append({"product_id": it.product_id, "status": "error", "detail": f"AI search error: {outcome}"})
+            continue
+
+        pricing  = calculate_price(market_inr=outcome["inr_price"], exchange_rate=exchange_rate)
+        # id assigned up front so the response needs no refresh after commit
+        proposal = PriceProposal(
+            id                = uuid.uuid4(),
+            product_id        = uuid.UUID(it.product_id),
+            proposed_by       = admin.id,
+            inr_price         = outcome["inr_price"],
+            source            = outcome["source"],
+            confidence        = outcome["confidence"],
+            exchange_rate     = exchange_rate,
+            rate_source       = rate_source,
+            final_price_lsl   = pricing["final_price_lsl"],
+            compare_price_lsl = pricing["compare_price_lsl"],
+            discount_pct      = pricing["discount_pct"],
+            margin_pct        = pricing["margin_pct"],
+            status            = ProposalStatus.pending,
+        )
+        proposals.append(proposal)
+        results.append({
+            "product_id":        it.product_id,
+            "title":             it.title,
+            "status":            "pending",
+            "proposal_id":       str(proposal.id),
+            "inr_price":         outcome["inr_price"],
+            "source":            outcome["source"],
+            "confidence":        outcome["confidence"],
+            "final_price_lsl":   pricing["final_price_lsl"],
+            "compare_price_lsl": pricing["compare_price_lsl"],
+            "discount_pct":      pricing["discount_pct"],
+            "margin_pct":        pricing["margin_pct"],
+        })
+
+    if proposals:
+        # Expire existing pending proposals for every product we re-proposed
+        await db.execute(_supersede_pending([p.product_id for p in proposals]))
+        db.add_all(proposals)
+        await db.commit()
+
+    return {
+        "exchange_rate":    exchange_rate,
+        "rate_source":      rate_source,
+        "is_fallback_rate": rate_source == "fallback",
+        "proposed":         len(proposals),
+        "failed":           len(results) - len(proposals),
+        "results":          results,
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MESSAGE BATCHES  (bulk runs at half the per-token cost, results within 24h)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _batch_summary(batch: PriceProposalBatch) -> dict:
+    return {
+        "batch_id":       batch.batch_id,
+        "status":         batch.status,
+        "item_count":     batch.item_count,
+        "proposed":       batch.proposed_count,
+        "failed":         batch.failed_count,
+        "exchange_rate":  batch.exchange_rate,
+        "rate_source":    batch.rate_source,
+        "ended_at":       batch.ended_at,
+        "created_at":     batch.created_at,
+    }
+
+
+@router.post("/products/admin/auto-price/propose-batch-async")
+async def propose_price_batch_async(
+    req:   ProposeBulkRequest,
+    db:    AsyncSession = Depends(get_async_db),
+    admin = Depends(get_current_admin),
+):
+    """
+    Submit a bulk run to the Anthropic Message Batches API.
+
+    Returns immediately with a batch_id; poll
+    GET /products/admin/auto-price/batch/{batch_id}/poll until status="ended",
+    at which point the results are saved as pending PriceProposals.
+    The single-product /propose endpoint stays on the realtime API.
+    """
+    try:
+        _check_ai_configured()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    items = list({it.product_id: it for it in req.items}.values())
+    found = await _existing_product_ids(db, [it.product_id for it in items])
+    await db.commit()   # release the connection during the rate fetch / submit
+    missing = [it.product_id for it in items if it.product_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Products not found: {', '.join(missing[:10])}")
+
+    exchange_rate, rate_source = await fetch_exchange_rate()
+
+    # anthropic 0.39.0 ships batches under client.beta only; the SDK adds
+    # the message-batches beta header itself.
+    client = _get_client()
+    try:
+        batch = await client.beta.messages.batches.create(requests=[
+            {
+                "custom_id": it.product_id,
+                "params":    _price_request_params(it.title, it.brand, it.category),
+            }
+            for it in items
+        ])
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"AI batch submit error: {str(e)}")
+
+    row = PriceProposalBatch(
+        batch_id      = batch.id,
+        status        = "submitted",
+        submitted_by  = admin.id,
+        exchange_rate = exchange_rate,
+        rate_source   = rate_source,
+        item_count    = len(items),
+        items         = [it.model_dump() for it in items],
+    )
+    db.add(row)
+    await db.commit()
+
+    return {
+        "batch_id":         batch.id,
+        "status":           "submitted",
+        "item_count":       len(items),
+        "exchange_rate":    exchange_rate,
+        "rate_source":      rate_source,
+        "is_fallback_rate": rate_source == "fallback",
+    }
+
+
+@router.get("/products/admin/auto-price/batch/{batch_id}/poll")
+async def poll_price_batch(
+    batch_id: str,
+    db:    AsyncSession = Depends(get_async_db),
+    admin = Depends(get_current_admin),
+):
+    """
+    Check a submitted batch. Once Anthropic reports it ended, import every
+    succeeded result as a pending PriceProposal (one commit) and mark the
+    batch ended; later polls just return the stored summary.
+    """
+    row = await db.scalar(select(PriceProposalBatch).where(PriceProposalBatch.batch_id == batch_id))
+    if not row:
+        raise HTTPException(404, "Batch not found")
+    await db.commit()   # release the connection during the Anthropic calls
+    if row.status == "ended":
+        return _batch_summary(row)
+
+    try:
+        _check_ai_configured()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    client = _get_client()
+    try:
+        remote = await client.beta.messages.batches.retrieve(batch_id)
+        if remote.processing_status != "ended":
+            return {
+                **_batch_summary(row),
+                "processing_status": remote.processing_status,
+                "request_counts":    remote.request_counts.model_dump(),
+            }
+        entries = [entry async for entry in await client.beta.messages.batches.results(batch_id)]
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"AI batch poll error: {str(e)}")
+
+    titles    = {it["product_id"]: it.get("title") or "" for it in (row.items or [])}
+    proposals = []
+    errors    = []
+    for entry in entries:
+        pid = entry.custom_id
+        if entry.result.type != "succeeded":
+            errors.append(f"{pid}: {entry.result.type}")
+            continue
+        try:
+            price_data = _parse_price_response(entry.result.message.content, titles.get(pid, pid))
+        except ValueError as e:
+            errors.append(f"{pid}: {str(e)}")
+            continue
+
+        pricing = calculate_price(market_inr=price_data["inr_price"], exchange_rate=row.exchange_rate)
+        proposals.append(PriceProposal(
+            product_id        = uuid.UUID(pid),
+            proposed_by       = row.submitted_by,
+            inr_price         = price_data["inr_price"],
+            source            = price_data["source"],
+            confidence        = price_data["confidence"],
+            exchange_rate     = row.exchange_rate,
+            rate_source       = row.rate_source,
+            final_price_lsl   = pricing["final_price_lsl"],
+            compare_price_lsl = pricing["compare_price_lsl"],
+            discount_pct      = pricing["discount_pct"],
+            margin_pct        = pricing["margin_pct"],
+            status            = ProposalStatus.pending,
+        ))
+
+    # Lock the batch row so two concurrent polls can't import the results twice
+    row = (await db.scalars(
+        select(PriceProposalBatch)
+        .where(PriceProposalBatch.batch_id == batch_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )).one()
+    if row.status == "ended":
+        summary = _batch_summary(row)   # read before rollback expires the row
+        await db.rollback()
+        return summary
+
+    if proposals:
+        # Products deleted while the batch ran are skipped
+        live = await _existing_product_ids(db, [p.product_id for p in proposals])
+        errors    += [f"{p.product_id}: product deleted" for p in proposals if str(p.product_id) not in live]
+        proposals  = [p for p in proposals if str(p.product_id) in live]
+
+    if proposals:
+        await db.execute(_supersede_pending([p.product_id for p in proposals]))
+        db.add_all(proposals)
+
+    row.status         = "ended"
+    row.proposed_count = len(proposals)
+    row.failed_count   = len(errors)
+    row.ended_at       = datetime.now(timezone.utc)
+    await db.commit()
+
+    return {**_batch_summary(row), "errors": errors}
+
+
 @router.post("/products/admin/auto-price/approve")
-def approve_proposal(
+async def approve_proposal(
     req:   ApproveRequest,
-    db:    Session = Depends(get_db),
+    db:    AsyncSession = Depends(get_async_db),
     admin = Depends(get_current_admin),
 ):
     """
@@ -462,51 +1140,69 @@ def approve_proposal(
       - proposal.approved_by  = admin.id
       - proposal.approved_at  = now()
     """
-    proposal = db.query(PriceProposal).filter(
-        PriceProposal.id == req.proposal_id,
-    ).first()
-    if not proposal:
-        raise HTTPException(404, "Proposal not found")
-    if proposal.status not in ("pending", "superseded"):
-        raise HTTPException(409, f"Proposal is already '{proposal.status}' — cannot approve")
-
-    product = db.query(Product).filter(
-        Product.id         == proposal.product_id,
-        Product.is_deleted == False,
-    ).first()
-    if not product:
-        raise HTTPException(404, "Product no longer exists")
-
+    proposal_id = _as_uuid(req.proposal_id, "Proposal not found")
     now = datetime.now(timezone.utc)
 
     # ── Atomic write — one commit ──────────────────────────────────────────
-    product.price          = proposal.final_price_lsl
-    product.compare_price  = proposal.compare_price_lsl
-    product.is_priced      = True
-    product.pricing_status = "admin_approved"
-    product.priced_by      = admin.id
-    product.priced_at      = now
-
-    proposal.status      = "approved"
-    proposal.approved_by = admin.id
-    proposal.approved_at = now
+    # The status check lives in the WHERE clause, so two admins approving
+    # the same proposal can't both win.
+    approved = (await db.execute(
+        update(PriceProposal)
+        .where(
+            PriceProposal.id == proposal_id,
+            PriceProposal.status.in_((ProposalStatus.pending, ProposalStatus.superseded)),
+        )
+        .values(status=ProposalStatus.approved, approved_by=admin.id, approved_at=now)
+        .returning(
+            PriceProposal.product_id,
+            PriceProposal.final_price_lsl,
+            PriceProposal.compare_price_lsl,
+        )
+        .execution_options(synchronize_session=False)
+    )).first()
+    if approved is None:
+        status = await db.scalar(select(PriceProposal.status).where(PriceProposal.id == proposal_id))
+        if status is None:
+            raise HTTPException(404, "Proposal not found")
+        raise HTTPException(409, f"Proposal is already '{status}' — cannot approve")
+
+    product_id = await db.scalar(
+        update(Product)
+        .where(
+            Product.id         == approved.product_id,
+            Product.is_deleted == False,
+        )
+        .values(
+            price          = approved.final_price_lsl,
+            compare_price  = approved.compare_price_lsl,
+            is_priced      = True,
+            pricing_status = PricingStatus.admin_approved,
+            priced_by      = admin.id,
+            priced_at      = now,
+        )
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    if product_id is None:
+        await db.rollback()
+        raise HTTPException(404, "Product no longer exists")
 
-    db.commit()
+    await db.commit()
 
     return {
-        "product_id":        str(product.id),
-        "proposal_id":       str(proposal.id),
-        "final_price_lsl":   product.price,
-        "compare_price_lsl": product.compare_price,
+        "product_id":        str(product_id),
+        "proposal_id":       str(proposal_id),
+        "final_price_lsl":   approved.final_price_lsl,
+        "compare_price_lsl": approved.compare_price_lsl,
         "approved_at":       now,
         "approved_by":       str(admin.id),
     }
 
 
 @router.post("/products/admin/auto-price/approve-manual")
-def approve_manual_price(
+async def approve_manual_price(
     req:   dict,
-    db:    Session = Depends(get_db),
+    db:    AsyncSession = Depends(get_async_db),
     admin = Depends(get_current_admin),
 ):
     """
@@ -523,10 +1219,11 @@ def approve_manual_price(
     if not product_id or price_lsl is None:
         raise HTTPException(400, "product_id and price_lsl are required")
 
-    product = db.query(Product).filter(
+    product_id = _as_uuid(product_id, "Product not found")
+    product = await db.scalar(select(Product).where(
         Product.id         == product_id,
         Product.is_deleted == False,
-    ).first()
+    ))
     if not product:
         raise HTTPException(404, "Product not found")
 
@@ -536,38 +1233,22 @@ def approve_manual_price(
     compare_final = compare_price_lsl or round(float(price_lsl) * COMPARE_MULT, 2)
 
     # Expire pending proposals
-    db.query(PriceProposal).filter(
-        PriceProposal.product_id == product_id,
-        PriceProposal.status     == "pending",
-    ).update({"status": "superseded"}, synchronize_session=False)
+    await db.execute(_supersede_pending([product_id]))
 
-    proposal = PriceProposal(
-        product_id        = product_id,
-        proposed_by       = admin.id,
-        inr_price         = inr_price,
-        source            = "manual",
-        confidence        = "high",
-        exchange_rate     = exchange_rate,
-        rate_source       = "manual",
-        final_price_lsl   = float(price_lsl),
-        compare_price_lsl = compare_final,
-        discount_pct      = round(((compare_final - float(price_lsl)) / compare_final) * 100) if compare_final else 0,
-        margin_pct        = round((PROFIT_INR * exchange_rate / float(price_lsl)) * 100, 1) if price_lsl else 0,
-        status            = "approved",
-        approved_by       = admin.id,
-        approved_at       = now,
-    )
+    proposal = PriceProposal(id=uuid.uuid4(), **_approved_proposal_row(
+        product_id, admin.id, now, float(price_lsl), compare_final,
+        exchange_rate=exchange_rate, inr_price=inr_price,
+    ))
     db.add(proposal)
 
     product.price          = float(price_lsl)
     product.compare_price  = compare_final
     product.is_priced      = True
-    product.pricing_status = "admin_approved"
+    product.pricing_status = PricingStatus.admin_approved
     product.priced_by      = admin.id
     product.priced_at      = now
 
-    db.commit()
-    db.refresh(proposal)
+    await db.commit()
 
     return {
         "product_id":        str(product.id),
@@ -579,9 +1260,9 @@ def approve_manual_price(
 
 
 @router.post("/products/admin/auto-price/approve-bulk")
-def approve_bulk_manual(
+async def approve_bulk_manual(
     req:   dict,
-    db:    Session = Depends(get_db),
+    db:    AsyncSession = Depends(get_async_db),
     admin = Depends(get_current_admin),
 ):
     """
@@ -593,109 +1274,108 @@ def approve_bulk_manual(
         raise HTTPException(400, "items array is required")
 
     now     = datetime.now(timezone.utc)
-    success = []
     errors  = []
+    parsed  = {}    # product uuid -> (price_lsl, compare_lsl, exchange_rate, inr_price); last wins
 
     for item in items:
         pid = item.get("product_id")
         try:
-            product = db.query(Product).filter(
-                Product.id         == pid,
-                Product.is_deleted == False,
-            ).first()
-            if not product:
-                raise ValueError("Product not found")
-
-            price_lsl    = float(item["price_lsl"])
-            compare_lsl  = float(item.get("compare_price_lsl") or round(price_lsl * COMPARE_MULT, 2))
-            exchange_rate = float(item.get("exchange_rate", FALLBACK_RATE))
-            inr_price     = float(item.get("inr_price", 0))
-
-            # Expire pending proposals
-            db.query(PriceProposal).filter(
-                PriceProposal.product_id == pid,
-                PriceProposal.status     == "pending",
-            ).update({"status": "superseded"}, synchronize_session=False)
-
-            proposal = PriceProposal(
-                product_id        = pid,
-                proposed_by       = admin.id,
-                inr_price         = inr_price,
-                source            = "manual",
-                confidence        = "high",
-                exchange_rate     = exchange_rate,
-                rate_source       = "manual",
-                final_price_lsl   = price_lsl,
-                compare_price_lsl = compare_lsl,
-                discount_pct      = round(((compare_lsl - price_lsl) / compare_lsl) * 100) if compare_lsl else 0,
-                margin_pct        = round((PROFIT_INR * exchange_rate / price_lsl) * 100, 1) if price_lsl else 0,
-                status            = "approved",
-                approved_by       = admin.id,
-                approved_at       = now,
+            price_lsl     = float(item["price_lsl"])
+            parsed[uuid.UUID(str(pid))] = (
+                price_lsl,
+                float(item.get("compare_price_lsl") or round(price_lsl * COMPARE_MULT, 2)),
+                float(item.get("exchange_rate", FALLBACK_RATE)),
+                float(item.get("inr_price", 0)),
             )
-            db.add(proposal)
-
-            product.price          = price_lsl
-            product.compare_price  = compare_lsl
-            product.is_priced      = True
-            product.pricing_status = "admin_approved"
-            product.priced_by      = admin.id
-            product.priced_at      = now
-
-            success.append(pid)
         except Exception as e:
             errors.append(f"{pid}: {str(e)}")
 
-    db.commit()
+    # One SELECT for every product instead of one per item
+    live = set(await db.scalars(select(Product.id).where(
+        Product.id.in_(list(parsed)),
+        Product.is_deleted == False,
+    ))) if parsed else set()
+    errors += [f"{pid}: Product not found" for pid in parsed if pid not in live]
+    valid   = [pid for pid in parsed if pid in live]
+
+    if valid:
+        # Expire pending proposals — one UPDATE for the whole batch
+        await db.execute(_supersede_pending(valid))
+
+        proposal_rows = []
+        product_rows  = []
+        for pid in valid:
+            price_lsl, compare_lsl, exchange_rate, inr_price = parsed[pid]
+            proposal_rows.append(_approved_proposal_row(
+                pid, admin.id, now, price_lsl, compare_lsl,
+                exchange_rate=exchange_rate, inr_price=inr_price,
+            ))
+            product_rows.append({
+                "id":             pid,
+                "price":          price_lsl,
+                "compare_price":  compare_lsl,
+                "is_priced":      True,
+                "pricing_status": PricingStatus.admin_approved,
+                "priced_by":      admin.id,
+                "priced_at":      now,
+            })
+
+        # Bulk INSERT (batched multi-row VALUES) + bulk UPDATE by primary key
+        await db.execute(insert(PriceProposal), proposal_rows)
+        await db.execute(update(Product), product_rows)
+
+    await db.commit()
 
     return {
-        "success": len(success),
+        "success": len(valid),
         "failed":  len(errors),
         "errors":  errors,
     }
 
 
 @router.post("/products/admin/auto-price/reject")
-def reject_proposal(
+async def reject_proposal(
     req:   RejectRequest,
-    db:    Session = Depends(get_db),
+    db:    AsyncSession = Depends(get_async_db),
     admin = Depends(get_current_admin),
 ):
     """Admin rejects a pending proposal — product stays unpriced."""
-    proposal = db.query(PriceProposal).filter(
-        PriceProposal.id == req.proposal_id,
-    ).first()
+    proposal = await db.scalar(select(PriceProposal).where(
+        PriceProposal.id == _as_uuid(req.proposal_id, "Proposal not found"),
+    ))
     if not proposal:
         raise HTTPException(404, "Proposal not found")
-    if proposal.status != "pending":
+    if proposal.status != ProposalStatus.pending:
         raise HTTPException(409, f"Proposal is already '{proposal.status}'")
 
-    product = db.query(Product).filter(Product.id == proposal.product_id).first()
-    if product:
-        product.pricing_status = "admin_rejected"
+    await db.execute(
+        update(Product)
+        .where(Product.id == proposal.product_id)
+        .values(pricing_status=PricingStatus.admin_rejected)
+        .execution_options(synchronize_session=False)
+    )
 
-    proposal.status      = "rejected"
+    proposal.status      = ProposalStatus.rejected
     proposal.approved_by = admin.id   # reusing field to record who acted
     proposal.approved_at = datetime.now(timezone.utc)
     if req.reason:
         proposal.reject_reason = req.reason
 
-    db.commit()
+    await db.commit()
     return {"proposal_id": str(proposal.id), "status": "rejected"}
 
 
 @router.get("/products/admin/auto-price/proposals/{product_id}")
-def get_proposals(
+async def get_proposals(
     product_id: str,
-    db:    Session = Depends(get_db),
+    db:    AsyncSession = Depends(get_async_db),
     admin = Depends(get_current_admin),
 ):
     """Return all pricing proposals for a product (newest first)."""
-    proposals = (
-        db.query(PriceProposal)
-        .filter(PriceProposal.product_id == product_id)
+    proposals = await db.scalars(
+        select(PriceProposal)
+        .where(PriceProposal.product_id == _as_uuid(product_id, "Product not found"))
         .order_by(PriceProposal.created_at.desc())
-        .all()
     )
     return [
         {
@@ -725,9 +1405,9 @@ def get_proposals(
 # ══════════════════════════════════════════════════════════════════════════════
 
 @router.delete("/products/admin/pricing/{product_id}/delete")
-def delete_product_from_pricing(
+async def delete_product_from_pricing(
     product_id: str,
-    db:    Session = Depends(get_db),
+    db:    AsyncSession = Depends(get_async_db),
     admin = Depends(get_current_admin),
 ):
     """
@@ -741,27 +1421,24 @@ def delete_product_from_pricing(
     This uses the same soft-delete as the main product DELETE endpoint,
     so the product remains recoverable from the Admin > Products page.
     """
-    product = db.query(Product).filter(
-        Product.id         == product_id,
+    product = await db.scalar(select(Product).where(
+        Product.id         == _as_uuid(product_id, "Product not found or already deleted"),
         Product.is_deleted == False,
-    ).first()
+    ))
     if not product:
         raise HTTPException(404, "Product not found or already deleted")
 
     now = datetime.now(timezone.utc)
 
     # Expire any open pricing proposals
-    db.query(PriceProposal).filter(
-        PriceProposal.product_id == product_id,
-        PriceProposal.status     == "pending",
-    ).update({"status": "superseded"}, synchronize_session=False)
+    await db.execute(_supersede_pending([product.id]))
 
     product.is_deleted     = True
     product.deleted_at     = now
     product.status         = "inactive"
-    product.pricing_status = "deleted"
+    product.pricing_status = PricingStatus.deleted
 
-    db.commit()
+    await db.commit()
 
     return {
         "deleted":    True,
@@ -777,10 +1454,10 @@ def delete_product_from_pricing(
 # ══════════════════════════════════════════════════════════════════════════════
 
 @router.patch("/products/admin/pricing/{product_id}/mark")
-def mark_product_priced_legacy(
+async def mark_product_priced_legacy(
     product_id: str,
     payload:    dict,
-    db:         Session = Depends(get_db),
+    db:         AsyncSession = Depends(get_async_db),
     admin     = Depends(get_current_admin),
 ):
     """
@@ -792,10 +1469,10 @@ def mark_product_priced_legacy(
     If is_priced=False → resets product to unpriced / ai_suggested
     """
     is_priced = bool(payload.get("is_priced", True))
-    product   = db.query(Product).filter(
-        Product.id         == product_id,
+    product   = await db.scalar(select(Product).where(
+        Product.id         == _as_uuid(product_id, "Product not found"),
         Product.is_deleted == False,
-    ).first()
+    ))
     if not product:
         raise HTTPException(404, "Product not found")
 
@@ -804,36 +1481,23 @@ def mark_product_priced_legacy(
     if is_priced:
         # Only create a proposal if the product already has a price
         if product.price and product.price > 0:
-            db.query(PriceProposal).filter(
-                PriceProposal.product_id == product_id,
-                PriceProposal.status     == "pending",
-            ).update({"status": "superseded"}, synchronize_session=False)
-
-            proposal = PriceProposal(
-                product_id        = product_id,
-                proposed_by       = admin.id,
-                inr_price         = 0,
-                source            = "manual_mark",
-                confidence        = "high",
-                exchange_rate     = FALLBACK_RATE,
-                rate_source       = "manual",
-                final_price_lsl   = product.price,
-                compare_price_lsl = product.compare_price or round(product.price * COMPARE_MULT, 2),
-                status            = "approved",
-                approved_by       = admin.id,
-                approved_at       = now,
-            )
-            db.add(proposal)
+            await db.execute(_supersede_pending([product.id]))
+
+            db.add(PriceProposal(**_approved_proposal_row(
+                product.id, admin.id, now, product.price,
+                product.compare_price or round(product.price * COMPARE_MULT, 2),
+                source="manual_mark",
+            )))
 
         product.is_priced      = True
-        product.pricing_status = "admin_approved"
+        product.pricing_status = PricingStatus.admin_approved
         product.priced_by      = admin.id
         product.priced_at      = now
     else:
         product.is_priced      = False
-        product.pricing_status = "unpriced"
+        product.pricing_status = PricingStatus.unpriced
         product.priced_by      = None
         product.priced_at      = None
 
-    db.commit()
+    await db.commit()
     return {"id": product_id, "is_priced": is_priced}
\ No newline at end of file
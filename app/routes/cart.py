@@ -1,10 +1,14 @@
+import uuid
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, delete, func, join, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import Optional
 from pydantic import BaseModel
 
-from app.database import get_db
-from app.models import User, Cart, CartItem, Product, ProductVariant
+from app.database import get_async_db
+from app.models import User, Cart, CartItem, Product, ProductImage, ProductVariant
 from app.dependencies import get_current_user
 
 router = APIRouter(prefix="/cart", tags=["cart"])
@@ -29,18 +33,34 @@ class MergeCartPayload(BaseModel):
 
 
 # =====================================================
-# HELPER: GET OR CREATE CART
+# HELPERS
+# Cart handlers are async on the asyncpg pool (sized in app.database), so
+# a checkout rush queues on connections rather than tying up threadpool
+# workers.
+# AsyncSession keeps objects loaded after commit (expire_on_commit=False),
+# so no refresh round-trips are needed to build responses.
 # =====================================================
-def get_or_create_cart(db: Session, user: User) -> Cart:
+def _as_uuid(value, not_found: str) -> uuid.UUID:
+    # Malformed ids can't match a row — same 404 as a missing one.
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        raise HTTPException(status_code=404, detail=not_found)
+
+
+async def _get_cart(db: AsyncSession, user: User) -> Optional[Cart]:
+    return await db.scalar(select(Cart).where(Cart.user_id == user.id))
+
+
+async def get_or_create_cart(db: AsyncSession, user: User) -> Cart:
     """Get existing cart or create new one for user."""
-    cart = db.query(Cart).filter(Cart.user_id == user.id).first()
-    
+    cart = await _get_cart(db, user)
+
     if not cart:
         cart = Cart(user_id=user.id)
         db.add(cart)
-        db.commit()
-        db.refresh(cart)
-    
+        await db.commit()
+
     return cart
 
 
@@ -48,23 +68,47 @@ def get_or_create_cart(db: Session, user: User) -> Cart:
 # USER: GET CART
 # =====================================================
 @router.get("", status_code=status.HTTP_200_OK)
-def get_cart(
-    db: Session = Depends(get_db),
+async def get_cart(
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     """Get current user's cart with items."""
-    cart = (
-        db.query(Cart)
-        .options(
-            joinedload(Cart.items)
-            .joinedload(CartItem.product)
-            .joinedload(Product.images)
-        )
-        .filter(Cart.user_id == user.id)
-        .first()
+    # One round-trip, plain rows: the cart LEFT JOINed to its lines whose
+    # product is still active (inactive ones never leave the database), with
+    # line totals and the cart subtotal computed by Postgres. A cart with no
+    # live lines comes back as one row of NULL item columns.
+    # Thumbnail: first image by position (a correlated LIMIT 1 per line, not
+    # a join of every ProductImage row), then the product-level fallbacks.
+    first_image = (
+        select(ProductImage.image_url)
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.position)
+        .limit(1)
+        .scalar_subquery()
     )
+    line_total = CartItem.price * CartItem.quantity
+    live_lines = join(
+        CartItem, Product,
+        and_(Product.id == CartItem.product_id, Product.status == "active"),
+    )
+    rows = (await db.execute(
+        select(
+            Cart.id.label("cart_id"),
+            CartItem.id, CartItem.product_id, CartItem.variant_id,
+            CartItem.price, CartItem.quantity,
+            line_total.label("line_total"),
+            func.sum(line_total).over().label("cart_subtotal"),
+            Product.title, first_image.label("first_image"),
+            Product.main_image, Product.image_url,
+            Product.in_stock, Product.stock,
+        )
+        .select_from(Cart)
+        .outerjoin(live_lines, CartItem.cart_id == Cart.id)
+        .where(Cart.user_id == user.id)
+        .order_by(CartItem.created_at)
+    )).all()
 
-    if not cart:
+    if not rows:
         return {
             "cart_id": None,
             "items": [],
@@ -72,35 +116,50 @@ def get_cart(
             "subtotal": 0,
         }
 
-    items = []
-    subtotal = 0
-
-    for item in cart.items:
-        # Check if product still exists and is active
-        if not item.product or item.product.status != "active":
-            continue
-
-        item_total = item.price * item.quantity
-        subtotal += item_total
-
-        items.append({
-            "id": str(item.id),
-            "product_id": str(item.product_id),
-            "variant_id": str(item.variant_id) if item.variant_id else None,
-            "title": item.product.title,
-            "image_url": item.product.images[0].image_url if item.product.images else None,
-            "price": item.price,
-            "quantity": item.quantity,
-            "subtotal": item_total,
-            "in_stock": item.product.in_stock,
-            "stock": item.product.stock,
-        })
+    items = [
+        {
+            "id": str(r.id),
+            "product_id": str(r.product_id),
+            "variant_id": str(r.variant_id) if r.variant_id else None,
+            "title": r.title,
+            "image_url": r.first_image or r.main_image or r.image_url,
+            "price": r.price,
+            "quantity": r.quantity,
+            "subtotal": r.line_total,
+            "in_stock": r.in_stock,
+            "stock": r.stock,
+        }
+        for r in rows if r.id is not None
+    ]
 
     return {
-        "cart_id": str(cart.id),
+        "cart_id": str(rows[0].cart_id),
         "items": items,
         "total_items": len(items),
-        "subtotal": subtotal,
+        "subtotal": rows[0].cart_subtotal or 0,
+    }
+
+
+# =====================================================
+# USER: CART SUMMARY (header badge)
+# =====================================================
+@router.get("/summary", status_code=status.HTTP_200_OK)
+async def get_cart_summary(
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Line count and subtotal for the header badge — one indexed row, no join.
+    Trigger-maintained over all lines; GET /cart still drops lines whose
+    product has since gone inactive.
+    """
+    row = (await db.execute(
+        select(Cart.item_count, Cart.subtotal).where(Cart.user_id == user.id)
+    )).first()
+
+    return {
+        "item_count": row.item_count if row else 0,
+        "subtotal": row.subtotal if row else 0,
     }
 
 
@@ -108,17 +167,22 @@ def get_cart(
 # USER: ADD TO CART
 # =====================================================
 @router.post("/items", status_code=status.HTTP_201_CREATED)
-def add_to_cart(
+async def add_to_cart(
     payload: AddToCartPayload,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     """Add item to cart."""
+    product_id = _as_uuid(payload.product_id, "Product not found or inactive")
+    variant_id = _as_uuid(payload.variant_id, "Variant not found") if payload.variant_id else None
+
     # Validate product exists
-    product = db.query(Product).filter(
-        Product.id == payload.product_id,
-        Product.status == "active"
-    ).first()
+    product = await db.scalar(
+        select(Product).where(
+            Product.id == product_id,
+            Product.status == "active"
+        )
+    )
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found or inactive")
@@ -131,17 +195,15 @@ def add_to_cart(
         )
 
     # Get or create cart
-    cart = get_or_create_cart(db, user)
+    cart = await get_or_create_cart(db, user)
 
     # Check if item already in cart
-    existing_item = (
-        db.query(CartItem)
-        .filter(
+    existing_item = await db.scalar(
+        select(CartItem).where(
             CartItem.cart_id == cart.id,
-            CartItem.product_id == payload.product_id,
-            CartItem.variant_id == payload.variant_id if payload.variant_id else CartItem.variant_id.is_(None)
+            CartItem.product_id == product_id,
+            CartItem.variant_id == variant_id if variant_id else CartItem.variant_id.is_(None)
         )
-        .first()
     )
 
     if existing_item:
@@ -153,9 +215,8 @@ def add_to_cart(
                 detail=f"Cannot add more. Stock limit: {product.stock}"
             )
         existing_item.quantity = new_quantity
-        db.commit()
-        db.refresh(existing_item)
-        
+        await db.commit()
+
         return {
             "message": "Cart updated",
             "item_id": str(existing_item.id),
@@ -165,15 +226,14 @@ def add_to_cart(
     # Create new cart item
     cart_item = CartItem(
         cart_id=cart.id,
-        product_id=payload.product_id,
-        variant_id=payload.variant_id,
+        product_id=product_id,
+        variant_id=variant_id,
         quantity=payload.quantity,
         price=product.price,
     )
 
     db.add(cart_item)
-    db.commit()
-    db.refresh(cart_item)
+    await db.commit()
 
     return {
         "message": "Item added to cart",
@@ -186,23 +246,23 @@ def add_to_cart(
 # USER: UPDATE CART ITEM
 # =====================================================
 @router.patch("/items/{item_id}", status_code=status.HTTP_200_OK)
-def update_cart_item(
+async def update_cart_item(
     item_id: str,
     payload: UpdateCartItemPayload,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     """Update cart item quantity."""
-    cart = db.query(Cart).filter(Cart.user_id == user.id).first()
+    item_uuid = _as_uuid(item_id, "Cart item not found")
+    cart = await _get_cart(db, user)
 
     if not cart:
         raise HTTPException(status_code=404, detail="Cart not found")
 
-    item = (
-        db.query(CartItem)
+    item = await db.scalar(
+        select(CartItem)
         .options(joinedload(CartItem.product))
-        .filter(CartItem.id == item_id, CartItem.cart_id == cart.id)
-        .first()
+        .where(CartItem.id == item_uuid, CartItem.cart_id == cart.id)
     )
 
     if not item:
@@ -219,8 +279,7 @@ def update_cart_item(
         )
 
     item.quantity = payload.quantity
-    db.commit()
-    db.refresh(item)
+    await db.commit()
 
     return {
         "message": "Cart item updated",
@@ -233,28 +292,27 @@ def update_cart_item(
 # USER: REMOVE CART ITEM
 # =====================================================
 @router.delete("/items/{item_id}", status_code=status.HTTP_200_OK)
-def remove_cart_item(
+async def remove_cart_item(
     item_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     """Remove item from cart."""
-    cart = db.query(Cart).filter(Cart.user_id == user.id).first()
+    item_uuid = _as_uuid(item_id, "Cart item not found")
+    cart = await _get_cart(db, user)
 
     if not cart:
         raise HTTPException(status_code=404, detail="Cart not found")
 
-    item = (
-        db.query(CartItem)
-        .filter(CartItem.id == item_id, CartItem.cart_id == cart.id)
-        .first()
+    item = await db.scalar(
+        select(CartItem).where(CartItem.id == item_uuid, CartItem.cart_id == cart.id)
     )
 
     if not item:
         raise HTTPException(status_code=404, detail="Cart item not found")
 
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    await db.commit()
 
     return {"message": "Item removed from cart"}
 
@@ -263,18 +321,20 @@ def remove_cart_item(
 # USER: CLEAR CART
 # =====================================================
 @router.delete("/clear", status_code=status.HTTP_200_OK)
-def clear_cart(
-    db: Session = Depends(get_db),
+async def clear_cart(
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     """Clear all items from cart."""
-    cart = db.query(Cart).filter(Cart.user_id == user.id).first()
+    cart = await _get_cart(db, user)
 
     if not cart:
         return {"message": "Cart already empty"}
 
-    db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
-    db.commit()
+    await db.execute(
+        delete(CartItem).where(CartItem.cart_id == cart.id).execution_options(synchronize_session=False)
+    )
+    await db.commit()
 
     return {"message": "Cart cleared"}
 
@@ -283,9 +343,9 @@ def clear_cart(
 # USER: MERGE CART (For guest -> user conversion)
 # =====================================================
 @router.post("/merge", status_code=status.HTTP_200_OK)
-def merge_cart(
+async def merge_cart(
     payload: MergeCartPayload,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     """
@@ -295,36 +355,56 @@ def merge_cart(
     if not payload.guest_cart_items:
         return {"message": "No items to merge"}
 
-    cart = get_or_create_cart(db, user)
+    cart = await get_or_create_cart(db, user)
     merged_count = 0
     errors = []
 
+    # Parse ids up front: one malformed id must not break the bulk IN queries.
+    parsed = []
     for guest_item in payload.guest_cart_items:
+        if not isinstance(guest_item, dict):
+            errors.append(f"Invalid cart item: {guest_item!r}")
+            continue
+        product_id = guest_item.get("product_id")
+        variant_id = guest_item.get("variant_id")
         try:
-            product_id = guest_item.get("product_id")
-            variant_id = guest_item.get("variant_id")
-            quantity = guest_item.get("quantity", 1)
-
-            # Validate product
-            product = db.query(Product).filter(
-                Product.id == product_id,
-                Product.status == "active"
-            ).first()
+            parsed.append((
+                uuid.UUID(str(product_id)),
+                uuid.UUID(str(variant_id)) if variant_id else None,
+                guest_item.get("quantity", 1),
+            ))
+        except ValueError:
+            errors.append(f"Product {product_id} not found")
+
+    # Two queries for the whole guest cart instead of two per item
+    product_ids = {pid for pid, _, _ in parsed}
+    products = {
+        p.id: p
+        for p in await db.scalars(
+            select(Product).where(
+                Product.id.in_(product_ids),
+                Product.status == "active",
+            )
+        )
+    } if product_ids else {}
+    in_cart = {
+        (ci.product_id, ci.variant_id): ci
+        for ci in await db.scalars(
+            select(CartItem).where(
+                CartItem.cart_id == cart.id,
+                CartItem.product_id.in_(products.keys()),
+            )
+        )
+    } if products else {}
 
+    for product_id, variant_id, quantity in parsed:
+        try:
+            product = products.get(product_id)
             if not product:
                 errors.append(f"Product {product_id} not found")
                 continue
 
-            # Check if already in cart
-            existing = (
-                db.query(CartItem)
-                .filter(
-                    CartItem.cart_id == cart.id,
-                    CartItem.product_id == product_id,
-                    CartItem.variant_id == variant_id if variant_id else CartItem.variant_id.is_(None)
-                )
-                .first()
-            )
+            existing = in_cart.get((product_id, variant_id))
 
             if existing:
                 # Merge quantities
@@ -340,13 +420,14 @@ def merge_cart(
                     price=product.price,
                 )
                 db.add(cart_item)
+                in_cart[(product_id, variant_id)] = cart_item
 
             merged_count += 1
 
         except Exception as e:
             errors.append(str(e))
 
-    db.commit()
+    await db.commit()
 
     return {
         "message": f"Merged {merged_count} items",
@@ -7,6 +7,8 @@ Dynamic Category & Brand Discovery
 - Only shows categories/brands with active, in-stock inventory.
 """
 
+import time
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -14,12 +16,21 @@ from app.database import get_db
 
 router = APIRouter(tags=["categories-brands"])
 
+# The sidebar loads on every page; counts a minute stale are fine.
+CATEGORIES_CACHE_TTL = 60  # seconds
+
+# ✅ module-level cache — resets on every server restart
+_categories_cache: dict = {"data": None, "ts": 0.0}
+
 @router.get("/categories")
 def get_categories(db: Session = Depends(get_db)):
     """
     Returns all categories currently used by active products.
     If a product has no category or is NULL, it's grouped under 'Others'.
     """
+    if _categories_cache["data"] is not None and time.time() - _categories_cache["ts"] < CATEGORIES_CACHE_TTL:
+        return _categories_cache["data"]
+
     # Normalize at query level: lowercase + replace spaces/dashes with underscores.
     # This collapses "Anti Aging", "anti-aging", "anti_aging" into the same slug,
     # so the filter URL always matches DB values regardless of how they were stored.
@@ -55,7 +66,9 @@ def get_categories(db: Session = Depends(get_db)):
             "description":   f"Browse our selection of {name} products.",
             "image_url":     None,
         })
-        
+
+    _categories_cache["data"] = categories
+    _categories_cache["ts"]   = time.time()
     return categories
 
 @router.get("/categories/{slug}")
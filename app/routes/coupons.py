@@ -43,7 +43,7 @@ def remove_coupon():
 
 @router.get("/available", status_code=status.HTTP_200_OK)
 def get_available_coupons(db: Session = Depends(get_db)):
-    now = datetime.utcnow()
+    now = func.now()
     coupons = db.query(Coupon).filter(Coupon.is_active == True, Coupon.valid_from <= now, Coupon.valid_until >= now).all()
     return [{"code": c.code, "description": c.description, "discount_type": c.discount_type, "discount_value": c.discount_value} for c in coupons]
 
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import delete
 from sqlalchemy.orm import Session, joinedload
 from pydantic import BaseModel
 from typing import Optional, List
@@ -321,7 +322,9 @@ def create_order(
     # Clear user's cart after order is placed
     cart = db.query(Cart).filter(Cart.user_id == user.id).first()
     if cart:
-        db.query(CartItem).filter(CartItem.cart_id == cart.id).delete(synchronize_session=False)
+        db.execute(
+            delete(CartItem).where(CartItem.cart_id == cart.id).execution_options(synchronize_session=False)
+        )
 
     db.commit()
     db.refresh(order)
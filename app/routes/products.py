@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import func, or_
+from sqlalchemy import delete, func, or_, update
 from datetime import datetime, timezone
 from typing import Optional
 import csv
 import io
+import itertools
 import json
 
 from app.database import get_db
 from app.models import (
     Product, ProductImage, ProductVariant,
-    InventoryAdjustment, AuditLog, BulkUpload, BulkUploadStatus, Store,
+    InventoryAdjustment, BulkUpload, BulkUploadStatus, Store,
 )
 from app.dependencies import require_admin
+from app.audit import queue_audit_log
 from app.uploads.service import handle_upload
 
 router = APIRouter(prefix="/products", tags=["products"])
@@ -132,15 +134,16 @@ def normalize_category(
 # ─────────────────────────────────────────────
 
 def _log(db, admin, action, entity_type, entity_id, before=None, after=None, meta=None):
-    db.add(AuditLog(
+    queue_audit_log(
+        db,
         admin_id=admin.id if admin else None,
         action=action,
         entity_type=entity_type,
-        entity_id=str(entity_id),
+        entity_id=entity_id,
         before=before,
         after=after,
         meta=meta,
-    ))
+    )
 
 
 def _product_snapshot(p: Product) -> dict:
@@ -801,14 +804,15 @@ def bulk_delete(payload: dict, db: Session = Depends(get_db), admin=Depends(requ
     ids = payload.get("ids", [])
     if not ids:
         raise HTTPException(400, "ids required")
-    products = db.query(Product).filter(Product.id.in_(ids), Product.is_deleted == False).all()
-    for p in products:
-        p.is_deleted = True
-        p.deleted_at = datetime.now(timezone.utc)
-        p.status     = "inactive"
-    _log(db, admin, "bulk_delete", "product", "bulk", meta={"ids": ids, "count": len(products)})
+    count = db.execute(
+        update(Product)
+        .where(Product.id.in_(ids), Product.is_deleted == False)
+        .values(is_deleted=True, deleted_at=datetime.now(timezone.utc), status="inactive")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    _log(db, admin, "bulk_delete", "product", "bulk", meta={"ids": ids, "count": count})
     db.commit()
-    return {"message": "Products soft-deleted", "deleted": len(products)}
+    return {"message": "Products soft-deleted", "deleted": count}
 
 
 @router.delete("/admin/bulk-hard-delete", dependencies=[Depends(require_admin)])
@@ -820,10 +824,10 @@ def bulk_hard_delete(payload: dict, db: Session = Depends(get_db), admin=Depends
     if not payload.get("confirm"):
         raise HTTPException(400, "Send confirm: true to proceed with permanent deletion")
     # Allow hard-deleting any product regardless of soft-delete state
-    products = db.query(Product).filter(Product.id.in_(ids)).all()
-    count    = len(products)
-    for p in products:
-        db.delete(p)
+    # Images, variants, reviews, … go via ON DELETE CASCADE.
+    count = db.execute(
+        delete(Product).where(Product.id.in_(ids)).execution_options(synchronize_session=False)
+    ).rowcount
     _log(db, admin, "bulk_hard_delete", "product", "bulk", meta={"ids": ids, "count": count})
     db.commit()
     return {"message": "Products permanently deleted", "deleted": count}
@@ -1249,13 +1253,17 @@ def list_bulk_uploads(
 # ADMIN: IMPORT / VALIDATE / PREVIEW / EXPORT
 # ─────────────────────────────────────────────
 
+def _stream_csv(file: UploadFile) -> csv.DictReader:
+    """Decode the spooled upload lazily instead of read() + decode() full copies."""
+    file.file.seek(0)
+    return csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline=""))
+
+
 @router.post("/admin/import-validate", dependencies=[Depends(require_admin)])
 async def import_validate(file: UploadFile = File(...), db: Session = Depends(get_db)):
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(400, "File must be CSV")
-    contents  = await file.read()
-    text_data = contents.decode("utf-8-sig", errors="replace")
-    reader    = csv.DictReader(io.StringIO(text_data))
+    reader    = _stream_csv(file)
     rows      = list(reader)
     errors, warnings = [], []
 
@@ -1303,13 +1311,12 @@ async def import_validate(file: UploadFile = File(...), db: Session = Depends(ge
 async def import_preview(file: UploadFile = File(...)):
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(400, "File must be CSV")
-    contents  = await file.read()
-    text_data = contents.decode("utf-8-sig", errors="replace")
-    reader    = csv.DictReader(io.StringIO(text_data))
-    rows      = list(reader)
+    reader  = _stream_csv(file)
+    preview = list(itertools.islice(reader, 10))
+    total   = len(preview) + sum(1 for _ in reader)   # count the rest without keeping it
     return {
-        "total_rows": len(rows),
-        "columns":    list(rows[0].keys()) if rows else [],
+        "total_rows": total,
+        "columns":    list(preview[0].keys()) if preview else [],
         "preview": [
             {
                 "title":        row.get("title", ""),
@@ -1321,7 +1328,7 @@ async def import_preview(file: UploadFile = File(...)):
                 "brand":        row.get("brand", ""),
                 "image_count":  len([u for u in (row.get("image_urls", "") or "").split(",") if u.strip()]),
             }
-            for row in rows[:10]
+            for row in preview
         ],
     }
 
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session, joinedload
 from app.database import get_db
 from app.models import User, RecentlyViewed, Product
 from app.dependencies import get_current_user
-from sqlalchemy import func
+from sqlalchemy import delete, func
 
 router = APIRouter(prefix="/users/me/recently-viewed", tags=["recently-viewed"])
 
@@ -53,6 +53,9 @@ def clear_recently_viewed(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    db.query(RecentlyViewed).filter(RecentlyViewed.user_id == user.id).delete()
+    db.execute(
+        delete(RecentlyViewed).where(RecentlyViewed.user_id == user.id)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
     return {"message": "Recently viewed cleared"}
\ No newline at end of file
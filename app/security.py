@@ -1,13 +1,14 @@
 import os
+import hashlib
+import hmac
+import threading
+import time
 from datetime import datetime, timedelta
-from jose import jwt, JWTError
-from fastapi import Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from cachetools import TTLCache
+from jose import jwk, jwt, JWTError
+from fastapi import Request
 from pydantic import BaseModel
 
-from app.database import get_db
-from app.models import User
-
 # ======================================================
 # JWT CONFIG
 # ======================================================
@@ -18,6 +19,13 @@ if not SECRET_KEY:
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_DAYS = 7
+VERIFICATION_TOKEN_EXPIRE_SECONDS = 300
+
+# Prepared once: given a raw secret, jose re-runs jwk.construct() on every
+# encode, and on every decode first tries json.loads(secret) and catches
+# the failure.
+_SIGNING_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
+_VERIFICATION_HMAC = hmac.new(SECRET_KEY.encode(), digestmod=hashlib.sha256)
 
 
 # ======================================================
@@ -33,14 +41,32 @@ class TokenData(BaseModel):
 # TOKEN CREATION
 # ======================================================
 
+# Repeat logins within a few seconds (mobile re-auth, double submits) get
+# the token that was just issued instead of a fresh HMAC/encode. With a
+# 7-day lifetime the few seconds of age are irrelevant.
+ISSUED_TOKEN_CACHE_TTL = 15  # seconds
+
+_issued_tokens = TTLCache(maxsize=10000, ttl=ISSUED_TOKEN_CACHE_TTL)   # (user_id, role) -> token
+_issued_lock   = threading.Lock()
+
+
 def create_token(user_id: str, role: str) -> str:
+    key = (str(user_id), role)
+    with _issued_lock:
+        token = _issued_tokens.get(key)
+    if token is not None:
+        return token
+
     payload = {
         "sub": str(user_id),
         "role": role,
         "iat": datetime.utcnow(),
         "exp": datetime.utcnow() + timedelta(days=ACCESS_TOKEN_EXPIRE_DAYS),
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    token = jwt.encode(payload, _SIGNING_KEY, algorithm=ALGORITHM)
+    with _issued_lock:
+        _issued_tokens[key] = token
+    return token
 
 
 # ======================================================
@@ -50,44 +76,41 @@ def create_token(user_id: str, role: str) -> str:
 def decode_token(token: str) -> dict | None:
     """Decode a JWT token string and return the payload."""
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return jwt.decode(token, _SIGNING_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
 
 
 # ======================================================
-# TOKEN EXTRACTION & DECODING (REQUEST INPUT)
+# ADMIN RE-VERIFICATION TOKEN
+# Issued after a successful password re-check before destructive
+# actions. "<user_id>|<expiry>|<hmac>" — checking it is one HMAC,
+# so repeat confirmations inside the window skip bcrypt entirely.
 # ======================================================
 
-def decode_access_token(request: Request) -> TokenData:
-    """
-    ✅ FIXED: Extract token from request and decode it.
-    Returns TokenData object.
-    """
-    token = (
-        request.cookies.get("admin_access_token")
-        or request.cookies.get("access_token")
-        or request.headers.get("Authorization", "").replace("Bearer ", "")
-        or None
-    )
-    
+def _verification_signature(message: str) -> str:
+    mac = _VERIFICATION_HMAC.copy()
+    mac.update(message.encode())
+    return mac.hexdigest()
+
+
+def create_verification_token(user_id) -> str:
+    expires = int(time.time()) + VERIFICATION_TOKEN_EXPIRE_SECONDS
+    message = f"{user_id}|{expires}"
+    return f"{message}|{_verification_signature(message)}"
+
+
+def check_verification_token(token: str | None, user_id) -> bool:
     if not token:
-        raise HTTPException(
-            status_code=401, 
-            detail="Not authenticated"
-        )
-
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=401, 
-            detail="Invalid or expired token"
-        )
-
-    return TokenData(
-        user_id=payload["sub"],
-        role=payload.get("role", "user")
-    )
+        return False
+    try:
+        token_user, expires, signature = token.split("|")
+        expired = int(expires) < time.time()
+    except ValueError:
+        return False
+    if expired or token_user != str(user_id):
+        return False
+    return hmac.compare_digest(signature, _verification_signature(f"{token_user}|{expires}"))
 
 
 # ======================================================
@@ -102,39 +125,3 @@ def get_token_from_request(request: Request) -> str | None:
         or request.headers.get("Authorization", "").replace("Bearer ", "")
         or None
     )
-
-
-# ======================================================
-# CURRENT USER
-# ======================================================
-
-def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db),
-) -> User:
-    token = get_token_from_request(request)
-    if not token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-    user = db.query(User).filter(User.id == payload["sub"]).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-
-    if not user.is_active:
-        raise HTTPException(status_code=403, detail="User disabled")
-
-    return user
-
-
-# ======================================================
-# ADMIN GUARD
-# ======================================================
-
-def require_admin(user: User = Depends(get_current_user)) -> User:
-    if user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    return user
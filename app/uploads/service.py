@@ -23,6 +23,16 @@ ALLOWED_TYPES = IMAGE_TYPES | FILE_TYPES
 
 MAX_FILE_SIZE = 15 * 1024 * 1024  # 15MB
 
+# Leading "magic" bytes per declared type — the client-supplied
+# content_type is only trusted when the file header agrees with it.
+MAGIC_PREFIXES = {
+    "image/jpeg":      (b"\xff\xd8\xff",),
+    "image/jpg":       (b"\xff\xd8\xff",),
+    "image/png":       (b"\x89PNG\r\n\x1a\n",),
+    "image/gif":       (b"GIF87a", b"GIF89a"),
+    "application/pdf": (b"%PDF-",),
+}
+
 # ✅ FIXED: "payment_proofs" was missing — caused 400 on resubmit-proof endpoint
 ALLOWED_FOLDERS = {
     "avatars",
@@ -35,6 +45,12 @@ ALLOWED_FOLDERS = {
 # CENTRAL UPLOAD HANDLER
 # ======================================================
 
+def _matches_declared_type(head: bytes, content_type: str) -> bool:
+    if content_type == "image/webp":
+        return head[:4] == b"RIFF" and head[8:12] == b"WEBP"
+    return head.startswith(MAGIC_PREFIXES.get(content_type, (b"",)))
+
+
 def handle_upload(
     file: UploadFile,
     folder: str,
@@ -91,6 +107,16 @@ def handle_upload(
             detail=f"File size {round(size / 1024 / 1024, 1)}MB exceeds 15MB limit",
         )
 
+    # Sniff the header (16 bytes) — the body itself is never read into memory;
+    # Cloudinary streams it straight from the spooled upload file.
+    head = file.file.read(16)
+    file.file.seek(0)
+    if not _matches_declared_type(head, content_type):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File content does not match declared type '{content_type}'",
+        )
+
     # Unique public_id per upload — prevents Cloudinary cache collisions
     public_id = f"{folder}_{owner_id}_{uuid.uuid4().hex}"
 
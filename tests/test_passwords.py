@@ -0,0 +1,35 @@
+from app import passwords
+from app.passwords import DUMMY_HASH, hash_password, verify_and_update_password
+
+
+def test_dummy_hash_verify_is_never_cached(monkeypatch):
+    calls = []
+    real_verify = passwords.pwd_context.verify_and_update
+
+    def counting_verify(plain, hashed):
+        calls.append(hashed)
+        return real_verify(plain, hashed)
+
+    monkeypatch.setattr(passwords.pwd_context, "verify_and_update", counting_verify)
+
+    for _ in range(3):
+        assert verify_and_update_password("guess-123", DUMMY_HASH) == (False, None)
+
+    assert calls == [DUMMY_HASH] * 3
+    assert not any(key[0] == DUMMY_HASH for key in passwords._verify_results)
+
+
+def test_real_hash_verify_is_cached(monkeypatch):
+    stored = hash_password("correct horse")
+    calls = []
+    real_verify = passwords.pwd_context.verify_and_update
+
+    def counting_verify(plain, hashed):
+        calls.append(hashed)
+        return real_verify(plain, hashed)
+
+    monkeypatch.setattr(passwords.pwd_context, "verify_and_update", counting_verify)
+
+    assert verify_and_update_password("correct horse", stored)[0] is True
+    assert verify_and_update_password("correct horse", stored)[0] is True
+    assert calls == [stored]